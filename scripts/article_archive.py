@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Article Archive
+Archive SQLite de tous les articles scrapés, indexée en plein texte (FTS5)
+sur titre, contenu, source et mots-clés, pour retrouver les histoires liées
+des N derniers jours sans re-scraper
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+from poll_scheduler import parse_timestamp
+from seen_store import SeenArticleStore
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Mots trop fréquents pour distinguer une histoire d'une autre
+QUERY_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "new", "is", "its",
+    "le", "la", "les", "un", "une", "des", "de", "du", "et", "en", "pour", "avec", "sur", "nouvelle", "nouveau",
+    "3d", "print", "printing", "printer", "impression", "imprimante"
+}
+
+
+class ArticleArchive:
+    """Articles archivés (table articles + index FTS5 synchronisé par triggers)"""
+
+    # Poids bm25 des colonnes indexées : title, content, source, keywords
+    BM25_WEIGHTS = (10.0, 1.0, 2.0, 5.0)
+
+    def __init__(self, db_path: str = "data/article_archive.db", retention_days: float = 365):
+        """
+        Initialise l'archive
+
+        Args:
+            db_path: Fichier SQLite
+            retention_days: Durée de conservation d'un article (jours)
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                link TEXT UNIQUE NOT NULL,
+                title TEXT,
+                content TEXT,
+                source TEXT,
+                keywords TEXT,
+                score INTEGER,
+                published REAL NOT NULL,
+                archived_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_published ON articles(published);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, content, source, keywords,
+                content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts(rowid, title, content, source, keywords)
+                VALUES (new.id, new.title, new.content, new.source, new.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, content, source, keywords)
+                VALUES ('delete', old.id, old.title, old.content, old.source, old.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, content, source, keywords)
+                VALUES ('delete', old.id, old.title, old.content, old.source, old.keywords);
+                INSERT INTO articles_fts(rowid, title, content, source, keywords)
+                VALUES (new.id, new.title, new.content, new.source, new.keywords);
+            END;
+        """)
+        self.conn.commit()
+        self.prune()
+
+    def add_many(self, articles: List[Dict]) -> int:
+        """Ajoute ou met à jour des articles (clé = lien normalisé), retourne le nombre écrit"""
+        now = time.time()
+        rows = []
+        for article in articles:
+            link = SeenArticleStore.normalize_link(article.get("link", ""))
+            if not link:
+                continue
+            keywords = article.get("keywords") or []
+            if isinstance(keywords, (list, tuple)):
+                keywords = " ".join(str(k) for k in keywords)
+            rows.append((
+                link,
+                article.get("title", ""),
+                article.get("full_text") or article.get("content", ""),
+                article.get("source", ""),
+                keywords,
+                article.get("score"),
+                parse_timestamp(article.get("published", "")) or now,
+                now
+            ))
+
+        with self._lock:
+            # Upsert : un article revu garde son id, ses mots-clés ne sont pas effacés
+            self.conn.executemany(
+                "INSERT INTO articles (link, title, content, source, keywords, score, published, archived_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(link) DO UPDATE SET"
+                " title = excluded.title,"
+                " content = CASE WHEN length(excluded.content) > length(content) THEN excluded.content ELSE content END,"
+                " source = excluded.source,"
+                " keywords = CASE WHEN excluded.keywords != '' THEN excluded.keywords ELSE keywords END,"
+                " score = COALESCE(excluded.score, score)",
+                rows
+            )
+            self.conn.commit()
+        logger.info(f"🗄️ Archive: {len(rows)} articles enregistrés")
+        return len(rows)
+
+    def search(self, query: str, days: float = 7, limit: int = 5, exclude_link: str = None) -> List[Dict]:
+        """Articles des `days` derniers jours qui correspondent à une requête FTS5"""
+        if not query:
+            return []
+        since = time.time() - days * 86400
+        exclude = SeenArticleStore.normalize_link(exclude_link) if exclude_link else ""
+        with self._lock:
+            try:
+                rows = self.conn.execute(
+                    "SELECT a.title, a.source, a.link, a.published, a.keywords, "
+                    f"  bm25(articles_fts, {', '.join(str(w) for w in self.BM25_WEIGHTS)}) AS rank"
+                    " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+                    " WHERE articles_fts MATCH ? AND a.published >= ? AND a.link != ?"
+                    " ORDER BY rank LIMIT ?",
+                    (query, since, exclude, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"⚠️ Archive: requête invalide '{query}': {e}")
+                return []
+        return [{
+            "title": title,
+            "source": source,
+            "link": link,
+            "published": time.strftime("%Y-%m-%d", time.localtime(published)),
+            "keywords": keywords.split() if keywords else [],
+            "rank": rank
+        } for title, source, link, published, keywords, rank in rows]
+
+    def related(self, article: Dict, days: float = 7, limit: int = 5) -> List[Dict]:
+        """Histoires liées à un article (termes du titre et mots-clés) sur les derniers jours"""
+        start = time.perf_counter()
+        keywords = article.get("keywords") or []
+        if isinstance(keywords, str):
+            keywords = keywords.split()
+        text = " ".join([article.get("title", "")] + [str(k) for k in keywords])
+        terms = []
+        for word in WORD_RE.findall(text.lower()):
+            if len(word) > 1 and word not in QUERY_STOPWORDS and word not in terms:
+                terms.append(word)
+        # OR de termes entre guillemets : aucun caractère spécial FTS5 n'est interprété
+        query = " OR ".join(f'"{term}"' for term in terms[:12])
+        related = self.search(query, days=days, limit=limit, exclude_link=article.get("link"))
+        logger.debug(f"🗄️ Archive: {len(related)} histoires liées en {(time.perf_counter() - start) * 1000:.1f} ms")
+        return related
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def prune(self):
+        """Supprime les articles plus vieux que la rétention"""
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            deleted = self.conn.execute("DELETE FROM articles WHERE published < ?", (cutoff,)).rowcount
+            self.conn.commit()
+        if deleted:
+            logger.info(f"🗑️ Archive: {deleted} articles expirés supprimés")
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    """Fonction de test"""
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    archive = ArticleArchive()
+    query = " ".join(sys.argv[1:]) or "Prusa Core One"
+    print(f"\n🗄️ {archive.count()} articles archivés, histoires liées à '{query}':\n")
+    for story in archive.related({"title": query}, days=30, limit=10):
+        print(f"   {story['published']}  {story['source'][:20]:20}  {story['title'][:70]}")
+
+
+if __name__ == "__main__":
+    main()
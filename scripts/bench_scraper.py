@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Scraper Benchmark
+Lance JT3DScraper contre le serveur de flux local (synthétique ou archive
+enregistrée), sans internet, et mesure articles/s et temps de scrape p50/p95
+
+Usage:
+    python scripts/bench_scraper.py --feeds 1000 --entries 50 --latency 0.05 --jitter 0.2 --error-rate 0.02
+    python scripts/bench_scraper.py --archive data/http_archive.jsonl.gz --runs 5
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import http_client
+from feed_replay import FeedStandInServer
+from scraper_complete import JT3DScraper
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper benchmark (offline)")
+    parser.add_argument("--feeds", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence de base par flux (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latence aléatoire ajoutée (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--archive", help="Sert une archive enregistrée au lieu de flux synthétiques")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--per-domain", type=int, default=32, help="Tous les flux locaux partagent un domaine")
+    parser.add_argument("--time-budget", type=float, default=120)
+    parser.add_argument("--feed-cache", action="store_true", help="Active le cache ETag (runs 2+ en 304)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # Tous les flux locaux sont sur le même hôte : la limite par hôte du client partagé doit suivre les flags
+    http_client.configure({"global_limit": args.workers, "per_host_limit": args.per_domain,
+                           "max_connections": max(64, args.workers)})
+
+    server = FeedStandInServer(
+        feeds=args.feeds, entries=args.entries, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, archive_path=args.archive
+    ).start()
+
+    # État du scraper (seen store, caches, breakers) isolé dans un dossier temporaire
+    workdir = tempfile.mkdtemp(prefix="jt3d-bench-")
+    os.chdir(workdir)
+
+    config = {
+        "rss_feeds": server.urls(),
+        "entries_per_feed": args.entries,
+        "max_workers": args.workers,
+        "per_domain_limit": args.per_domain,
+        "time_budget": args.time_budget,
+        "source_deadline": args.time_budget + 5,
+        "feed_cache": args.feed_cache,
+        "seen_store": False,
+        "sources": {name: {"enabled": False} for name in
+                    ("twitter", "instagram", "reddit", "devto", "youtube", "google_news")}
+    }
+    config["sources"]["rss"] = {"timeout": args.time_budget}
+
+    print(f"\n⏱️ {server.feed_count} flux × {args.entries} entrées, latence {args.latency}s "
+          f"+ [0, {args.jitter}]s, erreurs {args.error_rate:.0%}, {args.runs} runs\n")
+
+    durations, rates = [], []
+    for run in range(args.runs):
+        scraper = JT3DScraper(config)
+        start = time.perf_counter()
+        event = {}
+        for event in scraper.scrape_iter():
+            pass
+        elapsed = time.perf_counter() - start
+        durations.append(elapsed)
+        rates.append(event["articles_in"] / elapsed)
+        print(f"   run {run + 1}: {elapsed:6.2f}s  {event['articles_in']:7d} articles  "
+              f"{len(event['ranking']):6d} histoires  {rates[-1]:9.0f} articles/s")
+
+    server.stop()
+    print(f"\n   scrape time p50 {percentile(durations, 50):.2f}s  p95 {percentile(durations, 95):.2f}s")
+    print(f"   throughput  médiane {statistics.median(rates):.0f} articles/s\n")
+
+
+if __name__ == "__main__":
+    main()
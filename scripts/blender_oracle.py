@@ -186,6 +186,9 @@ class BlenderOracle:
         if audio_file:
             env["JT_AUDIO_FILE"] = os.path.abspath(audio_file)
         env["JT_OUTPUT_FILE"] = output_file
+        # Durée planifiée du script : la timeline ne dépend plus de l'audio final
+        if script and script.get("total_duration"):
+            env["JT_DURATION"] = str(script["total_duration"])
         
         # Construire la commande Blender
         cmd = [
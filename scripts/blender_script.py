@@ -17,6 +17,7 @@ from math import pi
 
 _audio_file_from_env = os.environ.get("JT_AUDIO_FILE", "")
 _output_file_from_env = os.environ.get("JT_OUTPUT_FILE", "")
+_duration_from_env = os.environ.get("JT_DURATION", "")
 
 blend_dir = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else os.getcwd()
 print(f"📁 Dossier Blender: {blend_dir}")
@@ -205,11 +206,13 @@ def play_action(character, action_name, frame):
 
 
 def get_audio_duration():
-    if not os.path.exists(AUDIO_FILE): return 30.0
+    # Durée estimée du script (JT_DURATION) quand l'audio n'est pas lisible
+    planned = float(_duration_from_env) if _duration_from_env else 30.0
+    if not os.path.exists(AUDIO_FILE): return planned
     try:
         from mutagen.mp3 import MP3
         return MP3(AUDIO_FILE).info.length
-    except: return 30.0
+    except: return planned
 
 
 def setup_timeline(duration):
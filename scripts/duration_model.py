@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Speech Duration Model
+Estime la durée parlée d'un texte par voix (caractères, mots, pauses de
+ponctuation) avant la synthèse, calibrée sur les fichiers TTS déjà générés
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ("chars", "words", "short_pauses", "sentence_pauses", "paragraph_pauses")
+
+# Débit et pauses par défaut (voix neuronale française, vitesse normale)
+DEFAULT_COEFFICIENTS = {
+    "chars": 1 / 15.0,        # ~15 caractères/s
+    "words": 0.0,
+    "short_pauses": 0.25,     # , ; :
+    "sentence_pauses": 0.45,  # . ! ? …
+    "paragraph_pauses": 0.7,  # ligne vide
+    "intercept": 0.3
+}
+
+# Débit de l'Edge TTS par défaut (audio-24khz-48kbitrate-mono-mp3)
+EDGE_TTS_BITRATE = 48000
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SHORT_PAUSE_RE = re.compile(r"[,;:—–]")
+SENTENCE_PAUSE_RE = re.compile(r"[.!?…]+(?=\s|$)")
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def text_features(text: str) -> List[float]:
+    """Caractéristiques d'un texte dans l'ordre de FEATURES"""
+    text = text.strip()
+    return [
+        float(sum(1 for c in text if not c.isspace())),
+        float(len(WORD_RE.findall(text))),
+        float(len(SHORT_PAUSE_RE.findall(text))),
+        float(len(SENTENCE_PAUSE_RE.findall(text))),
+        float(len(PARAGRAPH_RE.findall(text)))
+    ]
+
+
+def spoken_parts(script: Dict) -> List[Dict]:
+    """Parties lues d'un script (ouverture, segments, clôture), dans l'ordre"""
+    parts = [script.get("opening")] + list(script.get("segments") or []) + [script.get("closing")]
+    return [part for part in parts if part and part.get("text")]
+
+
+def spoken_text(script: Dict) -> str:
+    """Texte synthétisé pour un script : les parties séparées par un paragraphe"""
+    return "\n\n".join(part["text"] for part in spoken_parts(script))
+
+
+def audio_duration(path: str, bitrate: int = EDGE_TTS_BITRATE) -> Optional[float]:
+    """Durée d'un MP3 (mutagen si installé, sinon taille / débit constant)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        from mutagen.mp3 import MP3
+        return MP3(path).info.length
+    except ImportError:
+        return os.path.getsize(path) * 8 / bitrate
+    except Exception as e:
+        logger.warning(f"⚠️ Durée audio illisible ({path}): {e}")
+        return None
+
+
+def nnls(A: np.ndarray, b: np.ndarray, max_iter: int = None) -> np.ndarray:
+    """Moindres carrés non négatifs min ||Ax - b||, x >= 0 (ensemble actif de Lawson-Hanson)"""
+    n = A.shape[1]
+    # Colonnes normalisées : caractères (~1000) et pauses (~10) sur la même échelle
+    norms = np.linalg.norm(A, axis=0)
+    norms[norms == 0] = 1.0
+    A = A / norms
+    tol = 10 * np.finfo(float).eps * max(A.shape) * max(1.0, np.abs(A).sum(axis=0).max())
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    for _ in range(max_iter or 3 * n):
+        gradient = A.T @ (b - A @ x)
+        if passive.all() or gradient[~passive].max() <= tol:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+            if not passive.any() or z[passive].min() > 0:
+                break
+            # Recul jusqu'à la contrainte violée la plus proche, puis on la libère
+            blocking = passive & (z <= 0)
+            alpha = np.min(x[blocking] / (x[blocking] - z[blocking]))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+        x = z
+    return x / norms
+
+
+class DurationModel:
+    """Durée parlée = somme pondérée des caractéristiques du texte, coefficients par voix"""
+
+    def __init__(self, store_path: str = "data/tts_durations.json", min_samples: int = 12,
+                 max_samples: int = 500):
+        """
+        Initialise le modèle
+
+        Args:
+            store_path: Fichier JSON des mesures (texte -> durée réelle) par voix
+            min_samples: Mesures nécessaires pour un ajustement complet (moins : simple facteur d'échelle)
+            max_samples: Mesures gardées par voix (les plus récentes)
+        """
+        self.store_path = store_path
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.samples = {}       # voix -> [[features..., secondes], ...]
+        self.coefficients = {}  # voix -> {feature: coef, "intercept": ...}
+        self._lock = threading.Lock()
+        self._load()
+
+    def estimate(self, text: str, voice: str = "default") -> float:
+        """Durée estimée (s) du texte lu par `voice`"""
+        if not text or not text.strip():
+            return 0.0
+        coefficients = self.coefficients.get(voice, DEFAULT_COEFFICIENTS)
+        features = text_features(text)
+        seconds = coefficients["intercept"] + sum(coefficients[name] * value for name, value in zip(FEATURES, features))
+        return round(max(0.0, seconds), 2)
+
+    def observe(self, voice: str, text: str, seconds: float, save: bool = True):
+        """Ajoute une mesure (texte synthétisé, durée réelle du fichier) et réajuste la voix"""
+        if not text.strip() or not seconds or seconds <= 0:
+            return
+        with self._lock:
+            samples = self.samples.setdefault(voice, [])
+            samples.append(text_features(text) + [float(seconds)])
+            del samples[:-self.max_samples]
+            self.coefficients[voice] = self._fit(samples)
+        if save:
+            self.save()
+        logger.info(f"⏱️ Durée {voice}: {seconds:.1f}s mesurées, modèle recalibré sur {len(samples)} mesures")
+
+    def save(self):
+        with self._lock:
+            data = {"samples": self.samples}
+        store_dir = os.path.dirname(self.store_path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.store_path)
+
+    def _fit(self, samples: List[List[float]]) -> Dict[str, float]:
+        """Moindres carrés non négatifs ; avec peu de mesures, échelle du modèle par défaut"""
+        data = np.asarray(samples, dtype=np.float64)
+        X, y = data[:, :-1], data[:, -1]
+        default = np.array([DEFAULT_COEFFICIENTS[name] for name in FEATURES])
+
+        if len(samples) >= self.min_samples:
+            # Caractères et mots sont presque colinéaires : NNLS en garde un plutôt que d'en rendre un négatif
+            solution = nnls(np.hstack([X, np.ones((len(X), 1))]), y)
+            return dict(zip(FEATURES + ("intercept",), solution.tolist()))
+
+        # Même forme que le modèle par défaut, seul le débit de la voix est ajusté
+        predicted = X @ default + DEFAULT_COEFFICIENTS["intercept"]
+        scale = float(predicted @ y / (predicted @ predicted)) if predicted.any() else 1.0
+        return dict(zip(FEATURES, (default * scale).tolist()), intercept=DEFAULT_COEFFICIENTS["intercept"] * scale)
+
+    def _load(self):
+        if not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, encoding="utf-8") as f:
+                self.samples = json.load(f).get("samples", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Mesures de durée illisibles ({self.store_path}): {e}")
+            return
+        self.coefficients = {voice: self._fit(samples) for voice, samples in self.samples.items() if samples}
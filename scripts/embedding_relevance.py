@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Embedding Relevance
+Pertinence sémantique des articles : titre + résumé embeddés via Ollama
+(/api/embed, vecteurs en cache disque par hash du contenu) puis comparés aux
+prototypes de sujets en une seule multiplication de matrices. Les articles hors
+sujet ("print" d'une imprimante papier) ne passent pas à l'extraction.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sujets du JT (prototypes positifs) et faux amis (prototypes négatifs)
+TOPICS = {
+    "metal_am": "Metal additive manufacturing: laser powder bed fusion, binder jetting and directed energy "
+                "deposition of titanium, steel and aluminium parts.",
+    "industrial_am": "Industrial 3D printing of production parts for aerospace, automotive and medical "
+                     "implants, qualification and certification of additive manufacturing.",
+    "desktop_printers": "New desktop FDM and resin 3D printers from Prusa, Bambu Lab, Creality, Elegoo or "
+                        "Anycubic, filaments and slicer software.",
+    "materials": "Materials for 3D printing: polymer powders, photopolymer resins, filaments, composite and "
+                 "ceramic feedstock.",
+    "business": "3D printing industry business: funding rounds, acquisitions, earnings and partnerships of "
+                "additive manufacturing companies.",
+    "research": "3D printing research: bioprinting, 4D printing, printed electronics and construction 3D "
+                "printing of buildings."
+}
+
+OFF_TOPICS = {
+    "paper_printers": "Office paper printers: inkjet and laser document printing, ink and toner cartridges, "
+                      "photocopiers and print servers.",
+    "print_media": "Print media and publishing: newspapers, magazines, books and printed advertising."
+}
+
+
+class VectorCache:
+    """Vecteurs d'embedding par hash (modèle + texte), SQLite"""
+
+    def __init__(self, db_path: str = "data/embeddings.db"):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Vecteurs en cache parmi `keys` (float32)"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class EmbeddingRelevance:
+    """Score de pertinence par similarité cosinus aux prototypes de sujets"""
+
+    def __init__(self, client, model: str = "nomic-embed-text", cache: VectorCache = None,
+                 topics: Dict[str, str] = None, off_topics: Dict[str, str] = None,
+                 min_similarity: float = 0.45, summary_chars: int = 500, batch_size: int = 64,
+                 timeout: float = 10):
+        """
+        Initialise le scoring
+
+        Args:
+            client: OllamaClient (pool d'hôtes compris)
+            model: Modèle d'embedding Ollama
+            cache: Cache des vecteurs (optionnel)
+            topics: Prototypes des sujets couverts {nom: description}
+            off_topics: Prototypes des faux amis {nom: description}
+            min_similarity: Similarité minimale au meilleur sujet pour être pertinent
+            summary_chars: Longueur du résumé embeddé avec le titre
+            batch_size: Textes par appel /api/embed
+            timeout: Timeout d'un appel /api/embed (s) : le scoring tourne dans la boucle de scraping
+        """
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self.topics = topics or TOPICS
+        self.off_topics = off_topics if off_topics is not None else OFF_TOPICS
+        self.min_similarity = min_similarity
+        self.summary_chars = summary_chars
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.disabled = False  # Premier échec : plus d'appel d'embedding pour le reste du run
+        self._prototypes = None  # matrice (sujets + faux amis) x dim, normalisée
+
+    def score_many(self, articles: List[Dict]) -> Optional[np.ndarray]:
+        """
+        Score un batch d'articles (remplit "embedding_relevance", "embedding_topic" et "relevant")
+
+        Returns:
+            Similarité au meilleur sujet par article, None si Ollama est indisponible
+        """
+        if not articles:
+            return np.zeros(0, dtype=np.float32)
+        if self.disabled:
+            return None
+        try:
+            prototypes = self.prototypes()
+            vectors = self.embed([self._text(article) for article in articles])
+        except Exception as e:
+            # Ollama lent ou absent : le streaming du scraping ne doit pas l'attendre à chaque lot
+            self.disabled = True
+            logger.warning(f"⚠️ Embeddings indisponibles, pertinence non filtrée pour ce run: {e}")
+            return None
+
+        # Une seule multiplication : articles x (sujets + faux amis)
+        similarities = vectors @ prototypes.T
+        n_topics = len(self.topics)
+        best = similarities[:, :n_topics].max(axis=1)
+        best_topic = similarities[:, :n_topics].argmax(axis=1)
+        if len(self.off_topics):
+            off = similarities[:, n_topics:].max(axis=1)
+        else:
+            off = np.full(len(articles), -1.0, dtype=np.float32)
+        relevant = (best >= self.min_similarity) & (best > off)
+
+        names = list(self.topics)
+        for article, score, topic, ok in zip(articles, best, best_topic, relevant):
+            article["embedding_relevance"] = round(float(score), 3)
+            article["embedding_topic"] = names[topic]
+            article["relevant"] = bool(ok)
+        return best
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Vecteurs normalisés des textes (cache disque, appels Ollama par lots pour le reste)"""
+        keys = [VectorCache.key(self.model, text) for text in texts]
+        found = self.cache.get_many(list(set(keys))) if self.cache else {}
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing:
+            text_of = dict(zip(keys, texts))
+            computed = {}
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                vectors = self.client.embed(self.model, [text_of[k] for k in batch], timeout=self.timeout)
+                computed.update(zip(batch, (np.asarray(v, dtype=np.float32) for v in vectors)))
+            if self.cache:
+                self.cache.put_many(computed)
+            found.update(computed)
+            logger.info(f"🧭 Embeddings: {len(missing)} calculés, {len(set(keys)) - len(missing)} en cache")
+
+        matrix = np.stack([found[k] for k in keys])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def prototypes(self) -> np.ndarray:
+        if self._prototypes is None:
+            self._prototypes = self.embed(list(self.topics.values()) + list(self.off_topics.values()))
+        return self._prototypes
+
+    def _text(self, article: Dict) -> str:
+        summary = article.get("content") or ""
+        return f"{article.get('title', '')}. {summary[:self.summary_chars]}"
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Feed Cache
+Cache disque des flux RSS : ETag, Last-Modified et entrées parsées par URL.
+Permet les GET conditionnels (304 Not Modified) avec éviction LRU bornée en taille.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """Cache des flux sur disque (un fichier JSON par URL)"""
+
+    def __init__(self, cache_dir: str = "data/feed_cache", max_feeds: int = 200, max_mb: float = 20):
+        """
+        Initialise le cache
+
+        Args:
+            cache_dir: Dossier du cache
+            max_feeds: Nombre max de flux gardés
+            max_mb: Taille max du cache (Mo)
+        """
+        self.cache_dir = cache_dir
+        self.max_feeds = max_feeds
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Index en mémoire : clé -> (dernier accès, taille)
+        self._index = {}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                self._index[name[:-5]] = (stat.st_mtime, stat.st_size)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Retourne l'entrée du cache pour une URL (ou None)"""
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url: str) -> Dict:
+        """Headers If-None-Match / If-Modified-Since pour une URL"""
+        cached = self.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def put(self, url: str, etag: str, last_modified: str, title: str, entries: List[Dict]):
+        """Enregistre un flux téléchargé"""
+        key = self._key(url)
+        data = json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "title": title,
+            "entries": entries,
+            "fetched_at": time.time()
+        }, ensure_ascii=False).encode("utf-8")
+
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index[key] = (time.time(), len(data))
+            self._evict()
+
+    def touch(self, url: str):
+        """Marque un flux comme utilisé (réponse 304)"""
+        key = self._key(url)
+        with self._lock:
+            if key in self._index:
+                now = time.time()
+                self._index[key] = (now, self._index[key][1])
+                try:
+                    os.utime(self._path(url), (now, now))
+                except OSError:
+                    pass
+
+    def _evict(self):
+        """Supprime les flux les moins récemment utilisés au-delà des limites"""
+        total = sum(size for _, size in self._index.values())
+        for key, (_, size) in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if len(self._index) <= self.max_feeds and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}.json"))
+            except OSError:
+                pass
+            del self._index[key]
+            total -= size
+            logger.debug(f"🗑️ Feed cache: éviction {key}")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._key(url)}.json")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Concurrent Feed Fetcher
+Télécharge les flux RSS en parallèle : timeouts par flux, limite par domaine,
+budget global en secondes
+"""
+
+import feedparser
+import requests
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from datetime import datetime
+from typing import Dict, Iterator, List
+from urllib.parse import urlparse
+
+from feed_cache import FeedCache
+from http_client import shared_session
+from json_sources import parse_json_feed
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrentFeedFetcher:
+    """Récupère plusieurs flux en parallèle sous un budget de temps global"""
+
+    USER_AGENT = "JT3D-NewsBot/1.0 (+https://github.com/testmoti-byte/bot-actu-3d)"
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        per_domain_limit: int = 2,
+        time_budget: float = 60.0,
+        session: requests.Session = None,
+        cache: FeedCache = None
+    ):
+        """
+        Initialise le fetcher
+
+        Args:
+            max_workers: Nombre de téléchargements simultanés
+            connect_timeout: Timeout de connexion par flux (s)
+            read_timeout: Timeout de lecture par flux (s)
+            per_domain_limit: Requêtes simultanées max sur un même domaine
+            time_budget: Durée max de tout le scrape (s)
+            session: Session HTTP à réutiliser (optionnel)
+            cache: Cache ETag/Last-Modified pour les GET conditionnels (optionnel)
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.per_domain_limit = max(1, int(per_domain_limit))
+        self.time_budget = time_budget
+        # Connexions keep-alive et limites par hôte : client HTTP partagé du process
+        self.session = session or shared_session()
+        self.session.headers.setdefault("User-Agent", self.USER_AGENT)
+        self.cache = cache
+
+        self._domain_locks = {}
+        self._domain_locks_guard = threading.Lock()
+
+    def fetch_all(self, urls: List[str]) -> Dict:
+        """
+        Télécharge tous les flux et attend au plus `time_budget` secondes
+
+        Returns:
+            {"feeds": [résultats ok], "timed_out": [urls], "failed": {url: erreur},
+             "not_modified": nb de 304, "elapsed": s}
+        """
+        start = time.monotonic()
+        report = {"feeds": [], "timed_out": [], "failed": {}, "not_modified": 0, "elapsed": 0.0}
+
+        for result in self.iter_fetch(urls):
+            if result["status"] == "ok":
+                report["feeds"].append(result)
+                report["not_modified"] += result["from_cache"]
+            elif result["status"] == "timeout":
+                report["timed_out"].append(result["url"])
+            else:
+                report["failed"][result["url"]] = result["error"]
+
+        report["elapsed"] = time.monotonic() - start
+        logger.info(
+            f"📡 {len(report['feeds'])}/{len(urls)} flux en {report['elapsed']:.1f}s "
+            f"({report['not_modified']} en cache, {len(report['timed_out'])} timeout, {len(report['failed'])} erreurs)"
+        )
+        return report
+
+    def iter_fetch(self, urls: List[str]) -> Iterator[Dict]:
+        """Produit le résultat de chaque flux dès qu'il est terminé"""
+        deadline = time.monotonic() + self.time_budget
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="feed")
+        futures = {executor.submit(self._fetch_one, url, deadline): url for url in urls}
+        pending = set(futures)
+
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                pending.discard(future)
+                yield future.result()
+        except FuturesTimeout:
+            pass
+        finally:
+            # Les flux encore en cours sont abandonnés : on n'attend pas leurs threads
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in pending:
+            url = futures[future]
+            logger.warning(f"⏱️ Flux hors budget ({self.time_budget}s): {url}")
+            yield self._result(url, "timeout", error="time budget exceeded")
+
+    def _fetch_one(self, url: str, deadline: float) -> Dict:
+        """Télécharge et parse un flux en respectant la limite du domaine"""
+        start = time.monotonic()
+        domain_lock = self._domain_lock(url)
+
+        if not domain_lock.acquire(timeout=max(0.0, deadline - start)):
+            return self._result(url, "timeout", error="domain slot not acquired before deadline")
+
+        try:
+            headers = self.cache.conditional_headers(url) if self.cache else {}
+            response = self.session.get(
+                url,
+                headers=headers,
+                timeout=(self.connect_timeout, self.read_timeout)
+            )
+
+            # 304 : le flux n'a pas changé, on réutilise les entrées du cache
+            if response.status_code == 304 and self.cache:
+                cached = self.cache.get(url)
+                if cached:
+                    self.cache.touch(url)
+                    return self._result(url, "ok", elapsed=time.monotonic() - start, from_cache=True,
+                                        title=cached["title"], entries=cached["entries"])
+                # Entrée évincée entre l'envoi des validateurs et la réponse : GET complet
+                response = self.session.get(url, timeout=(self.connect_timeout, self.read_timeout))
+
+            if response.status_code != 200:
+                return self._result(url, "error", error=f"HTTP {response.status_code}",
+                                    elapsed=time.monotonic() - start)
+
+            parsed = self._parse_feed(response)
+            if self.cache:
+                self.cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                               parsed["title"], parsed["entries"])
+            return self._result(url, "ok", elapsed=time.monotonic() - start, **parsed)
+
+        except requests.Timeout as e:
+            return self._result(url, "timeout", error=str(e), elapsed=time.monotonic() - start)
+        except Exception as e:
+            logger.warning(f"Erreur RSS {url}: {e}")
+            return self._result(url, "error", error=str(e), elapsed=time.monotonic() - start)
+        finally:
+            domain_lock.release()
+
+    def _parse_feed(self, response: requests.Response) -> Dict:
+        """Parse la réponse en titre de flux + entrées normalisées (RSS/Atom ou JSON)"""
+        content_type = response.headers.get("Content-Type", "").lower()
+        if "json" in content_type:
+            # Pas de parse XML inutile sur une API JSON
+            return parse_json_feed(response.json())
+
+        feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+        entries = []
+        for entry in feed.entries:
+            entries.append({
+                "title": entry.get("title", ""),
+                "summary": entry.get("summary", ""),
+                "link": entry.get("link", ""),
+                "published": entry.get("published", datetime.now().isoformat())
+            })
+        return {"title": feed.feed.get("title", "Unknown"), "entries": entries}
+
+    def _domain_lock(self, url: str) -> threading.BoundedSemaphore:
+        """Sémaphore partagé par tous les flux d'un même domaine"""
+        domain = urlparse(url).netloc.lower()
+        with self._domain_locks_guard:
+            if domain not in self._domain_locks:
+                self._domain_locks[domain] = threading.BoundedSemaphore(self.per_domain_limit)
+            return self._domain_locks[domain]
+
+    @staticmethod
+    def _result(url: str, status: str, error: str = "", elapsed: float = 0.0, from_cache: bool = False,
+                title: str = "Unknown", entries: List[Dict] = None) -> Dict:
+        """Construit un résultat de flux"""
+        return {
+            "url": url,
+            "status": status,
+            "title": title,
+            "entries": entries or [],
+            "error": error,
+            "elapsed": elapsed,
+            "from_cache": from_cache
+        }
+
+
+def main():
+    """Fonction de test"""
+    from scraper_complete import JT3DScraper
+
+    fetcher = ConcurrentFeedFetcher(time_budget=30, cache=FeedCache())
+    report = fetcher.fetch_all(JT3DScraper.RSS_FEEDS)
+
+    print(f"\n📡 {len(report['feeds'])} flux OK en {report['elapsed']:.1f}s\n")
+    for feed in sorted(report["feeds"], key=lambda f: f["elapsed"], reverse=True):
+        cached = " (304)" if feed["from_cache"] else ""
+        print(f"   {feed['elapsed']:5.1f}s  {len(feed['entries']):3d} entrées  {feed['url']}{cached}")
+    for url in report["timed_out"]:
+        print(f"   ⏱️ timeout  {url}")
+    for url, error in report["failed"].items():
+        print(f"   ❌ {error}  {url}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
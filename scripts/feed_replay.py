@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Feed Record/Replay
+Enregistre les réponses HTTP du scraper dans une archive compressée, les
+rejoue hors ligne, et sert des flux enregistrés ou synthétiques via un petit
+serveur HTTP local (latence et taux d'erreur configurables)
+"""
+
+import base64
+import gzip
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_client import mount_shared, shared_session
+
+logger = logging.getLogger(__name__)
+
+# Headers gardés dans l'archive
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def load_archive(path: str) -> List[Dict]:
+    """Lit une archive (gzip JSON lines)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RecordingSession(requests.Session):
+    """Session requests qui garde chaque réponse finale pour l'archive"""
+
+    def __init__(self, archive_path: str):
+        super().__init__()
+        self.archive_path = archive_path
+        self.records = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        record = {
+            "url": request.url,
+            "status": response.status_code,
+            "headers": {k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers},
+            "elapsed": time.monotonic() - start
+        }
+        if kwargs.get("stream"):
+            # Seul ce que l'appelant lit est gardé : ses limites (max_bytes) valent aussi à l'enregistrement
+            record["body"] = bytearray()
+            response.raw = _RecordingRaw(response.raw, record["body"])
+        else:
+            record["body"] = response.content
+        with self._lock:
+            self.records.append(record)
+        return response
+
+    def save(self):
+        """Écrit l'archive compressée"""
+        with self._lock:
+            records = list(self.records)
+        with gzip.open(self.archive_path, "wt", encoding="utf-8") as f:
+            for record in records:
+                body = base64.b64encode(bytes(record["body"])).decode("ascii")
+                f.write(json.dumps(dict(record, body=body)) + "\n")
+        logger.info(f"💾 {len(records)} réponses enregistrées dans {self.archive_path}")
+
+
+class _RecordingRaw:
+    """Corps de réponse streamé qui copie dans `body` chaque morceau lu par l'appelant"""
+
+    def __init__(self, raw, body: bytearray):
+        self.raw = raw
+        self.body = body
+
+    def read(self, *args, **kwargs) -> bytes:
+        data = self.raw.read(*args, **kwargs)
+        self.body.extend(data)
+        return data
+
+    def stream(self, *args, **kwargs):
+        for chunk in self.raw.stream(*args, **kwargs):
+            self.body.extend(chunk)
+            yield chunk
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class ReplaySession(requests.Session):
+    """Session requests qui rejoue une archive sans réseau"""
+
+    def __init__(self, archive_path: str, replay_latency: bool = False):
+        """
+        Args:
+            archive_path: Archive créée par RecordingSession
+            replay_latency: Rejoue aussi la durée enregistrée de chaque réponse
+        """
+        super().__init__()
+        self.replay_latency = replay_latency
+        self.records = {}
+        for record in load_archive(archive_path):
+            self.records[record["url"]] = record  # La plus récente gagne
+        logger.info(f"📼 Replay: {len(self.records)} réponses chargées de {archive_path}")
+
+    def send(self, request, **kwargs):
+        record = self.records.get(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+
+        if record is None:
+            response.status_code = 404
+            response.reason = "Not in archive"
+            response._content = b""
+            return response
+
+        if self.replay_latency:
+            time.sleep(record.get("elapsed", 0))
+        response.status_code = record["status"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = base64.b64decode(record["body"])
+        return response
+
+    def save(self):
+        pass
+
+
+KEYWORD_WORDS = ["printer", "resin", "filament", "nozzle", "3D print", "additive", "prototype",
+                 "firmware", "release", "market", "startup", "metal", "laser", "review", "update"]
+FILLER_WORDS = ["alpha", "bravo", "delta", "omega", "nova", "terra", "vector", "pixel", "orbit", "quartz"]
+
+
+def synthetic_feed(index: int, entries: int, seed: int = 0) -> bytes:
+    """Flux RSS synthétique déterministe (titres mêlant mots-clés 3D et bruit)"""
+    rng = random.Random(seed * 100003 + index)
+    # Vocabulaire assez large pour que les histoires ne se ressemblent pas toutes (SimHash)
+    words = KEYWORD_WORDS + [f"{rng.choice(FILLER_WORDS)}{rng.randint(0, 999)}" for _ in range(60)]
+    now = datetime.now().astimezone()
+    items = []
+    for i in range(entries):
+        title = " ".join(rng.choices(words, k=6)).capitalize()
+        summary = " ".join(rng.choices(words, k=40))
+        published = format_datetime(now - timedelta(minutes=rng.randint(0, 36 * 60)))
+        items.append(
+            f"<item><title>{escape(title)} #{index}-{i}</title>"
+            f"<link>http://feeds.local/{index}/{i}</link>"
+            f"<description>{escape(summary)}</description>"
+            f"<pubDate>{published}</pubDate></item>"
+        )
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+        f"<title>Synthetic feed {index}</title>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 1024  # Des centaines de flux demandés en même temps
+    daemon_threads = True
+
+
+class FeedStandInServer:
+    """Serveur HTTP local qui remplace les vrais flux pour les tests et benchmarks"""
+
+    def __init__(self, feeds: int = 100, entries: int = 50, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, archive_path: str = None,
+                 port: int = 0, seed: int = 0):
+        """
+        Initialise le serveur
+
+        Args:
+            feeds: Nombre de flux synthétiques (ignoré si archive_path)
+            entries: Entrées par flux synthétique
+            latency: Latence de base par réponse (s)
+            jitter: Latence aléatoire ajoutée, uniforme dans [0, jitter] (s)
+            error_rate: Probabilité de répondre 500
+            archive_path: Sert les réponses d'une archive enregistrée au lieu de flux synthétiques
+            port: Port d'écoute (0 = port libre)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.records = load_archive(archive_path) if archive_path else None
+        self.feed_count = len(self.records) if self.records is not None else feeds
+        self.entries = entries
+        self.seed = seed
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _StandInHTTPServer(("127.0.0.1", port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = None
+
+    def urls(self) -> List[str]:
+        """URLs des flux servis"""
+        return [f"http://127.0.0.1:{self.port}/feed/{i}" for i in range(self.feed_count)]
+
+    def start(self) -> "FeedStandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="feed-stand-in", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 Feed stand-in: {self.feed_count} flux sur le port {self.port}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        with self._lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        try:
+            index = int(handler.path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            index = -1
+        if fail or not 0 <= index < self.feed_count:
+            handler.send_response(500 if fail else 404)
+            handler.end_headers()
+            return
+
+        if self.records is not None:
+            record = self.records[index]
+            status, headers, body = record["status"], record["headers"], base64.b64decode(record["body"])
+        else:
+            status, headers, body = 200, {"Content-Type": "application/rss+xml"}, self._synthetic(index)
+
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _synthetic(self, index: int) -> bytes:
+        with self._lock:
+            if index not in self._bodies:
+                self._bodies[index] = synthetic_feed(index, self.entries, self.seed)
+            return self._bodies[index]
+
+
+def build_session(mode: str = "live", archive_path: str = "data/http_archive.jsonl.gz") -> requests.Session:
+    """Session HTTP selon le mode : live, record ou replay (live et record passent par le client partagé)"""
+    if mode == "record":
+        return mount_shared(RecordingSession(archive_path))
+    if mode == "replay":
+        return ReplaySession(archive_path)
+    return shared_session()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Full-Text Fetcher
+Télécharge les pages des meilleures histoires en parallèle, extrait le texte
+principal avec lxml et le garde en cache disque par URL
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Dict, List, Optional
+
+import lxml.html
+import requests
+from lxml import etree
+
+from http_client import shared_session
+
+logger = logging.getLogger(__name__)
+
+# Balises jamais considérées comme du contenu
+NOISE_XPATH = "//script|//style|//noscript|//nav|//header|//footer|//aside|//form|//iframe|//svg"
+SPACE_RE = re.compile(r"\s+")
+
+
+def extract_main_text(html: bytes, parse_timeout: float = 2.0, min_paragraph: int = 40,
+                      max_bytes: int = 1024 * 1024) -> str:
+    """
+    Extrait le texte principal d'une page HTML
+
+    Garde le bloc dont les paragraphes <p> contiennent le plus de texte (hors liens).
+    Le parse lxml n'est pas interruptible : sa durée est bornée par la taille du HTML,
+    tronqué à `max_bytes` (~0,1 s par Mo). Au-delà de `parse_timeout` secondes, le
+    parcours des paragraphes s'arrête et retourne le meilleur bloc trouvé jusque-là.
+    """
+    deadline = time.monotonic() + parse_timeout
+    try:
+        doc = lxml.html.document_fromstring(html[:max_bytes])
+    except (etree.ParserError, ValueError):
+        return ""
+
+    for node in doc.xpath(NOISE_XPATH):
+        node.drop_tree()
+
+    # Score de chaque bloc parent = texte de ses paragraphes moins le texte des liens
+    scores = {}
+    for paragraph in doc.iter("p"):
+        if time.monotonic() > deadline:
+            logger.debug("⏱️ Full-text: parse timeout, extraction partielle")
+            break
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        text = SPACE_RE.sub(" ", paragraph.text_content()).strip()
+        if len(text) < min_paragraph:
+            continue
+        link_text = sum(len(a.text_content()) for a in paragraph.iter("a"))
+        scores[parent] = scores.get(parent, 0) + len(text) - link_text
+
+    if not scores:
+        return ""
+
+    best = max(scores, key=scores.get)
+    paragraphs = []
+    for paragraph in best.iter("p"):
+        text = SPACE_RE.sub(" ", paragraph.text_content()).strip()
+        if len(text) >= min_paragraph:
+            paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+class FullTextCache:
+    """Texte extrait par URL sur disque (un fichier JSON par URL, éviction LRU)"""
+
+    def __init__(self, cache_dir: str = "data/fulltext_cache", max_files: int = 500):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # Dernier accès pour l'éviction LRU
+        except OSError:
+            pass
+        return entry
+
+    def put(self, url: str, text: str, error: str = None):
+        """Enregistre le texte extrait (ou l'échec, pour ne pas retélécharger la page)"""
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "text": text, "error": error, "fetched_at": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        if len(names) <= self.max_files:
+            return
+        paths = sorted((os.path.join(self.cache_dir, name) for name in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+
+
+class FullTextFetcher:
+    """Enrichit les articles avec le texte complet de leur page (article["full_text"])"""
+
+    def __init__(
+        self,
+        session: requests.Session = None,
+        cache: FullTextCache = None,
+        max_workers: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        max_bytes: int = 1024 * 1024,
+        parse_timeout: float = 2.0,
+        time_budget: float = 20.0
+    ):
+        """
+        Initialise le fetcher
+
+        Args:
+            session: Session HTTP partagée (optionnel)
+            cache: Cache disque du texte extrait (optionnel)
+            max_workers: Pages téléchargées simultanément
+            connect_timeout: Timeout de connexion par page (s)
+            read_timeout: Timeout de lecture par page (s)
+            max_bytes: Octets lus max par page (le reste est ignoré)
+            parse_timeout: Durée max du parcours des paragraphes par page (s), le parse étant borné par max_bytes
+            time_budget: Durée max de tout l'enrichissement (s)
+        """
+        self.session = session or shared_session()
+        self.cache = cache
+        self.max_workers = max(1, int(max_workers))
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = int(max_bytes)
+        self.parse_timeout = parse_timeout
+        self.time_budget = time_budget
+
+    def enrich(self, articles: List[Dict]) -> int:
+        """Ajoute full_text aux articles (cache d'abord), retourne le nombre enrichi"""
+        pending = {}
+        enriched = 0
+        for article in articles:
+            link = article.get("link")
+            if not link or article.get("full_text"):
+                continue
+            cached = self.cache.get(link) if self.cache else None
+            if cached is not None:
+                if cached.get("text"):
+                    article["full_text"] = cached["text"]
+                    enriched += 1
+                continue
+            pending.setdefault(link, []).append(article)
+
+        if not pending:
+            return enriched
+
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                      thread_name_prefix="fulltext")
+        futures = {executor.submit(self.fetch, link): link for link in pending}
+        try:
+            for future in as_completed(futures, timeout=self.time_budget):
+                text = future.result()
+                if text:
+                    for article in pending[futures[future]]:
+                        article["full_text"] = text
+                        enriched += 1
+        except FuturesTimeout:
+            late = sum(1 for future in futures if not future.done())
+            logger.warning(f"⏱️ Full-text: {late} pages hors budget ({self.time_budget:.0f}s)")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(f"📄 Full-text: {enriched}/{len(articles)} articles enrichis en {time.monotonic() - start:.1f}s")
+        return enriched
+
+    def fetch(self, url: str) -> str:
+        """Télécharge une page (limitée à max_bytes) et retourne son texte principal"""
+        try:
+            response = self.session.get(url, timeout=(self.connect_timeout, self.read_timeout), stream=True)
+            try:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "text/html")
+                if "html" not in content_type:
+                    raise ValueError(f"contenu non HTML ({content_type})")
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes:]
+                        break
+            finally:
+                response.close()
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"⚠️ Full-text {url}: {e}")
+            if self.cache and self._is_permanent(e):
+                self.cache.put(url, "", error=str(e))
+            return ""
+
+        text = extract_main_text(bytes(body), self.parse_timeout, max_bytes=self.max_bytes)
+        # Page HTML sans texte extrait (rendu JS, page de consentement) : retentée au prochain run
+        if self.cache and text:
+            self.cache.put(url, text)
+        return text
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """Échec à mettre en cache : page non HTML ou 4xx définitif (pas 408/429, ni 5xx ou erreur réseau)"""
+        if isinstance(error, ValueError):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return 400 <= status < 500 and status not in (408, 429)
+        return False
+
+
+def main():
+    """Fonction de test"""
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    urls = sys.argv[1:] or ["https://blog.prusa3d.com/"]
+    fetcher = FullTextFetcher(cache=FullTextCache())
+    articles = [{"link": url} for url in urls]
+    fetcher.enrich(articles)
+    for article in articles:
+        print(f"\n🔗 {article['link']}\n{article.get('full_text', '')[:500]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Shared HTTP Client
+Client HTTP unique du process (httpx) : connexions keep-alive par hôte, HTTP/2
+quand le serveur le propose, limites de requêtes simultanées globale et par
+hôte, retries avec backoff exponentiel + jitter, histogrammes de latence par
+hôte. Les sessions requests du scraper, d'Ollama et de Telegram passent par
+lui via HTTPXAdapter.
+"""
+
+import email.utils
+import logging
+import os
+import random
+import ssl
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+logger = logging.getLogger(__name__)
+# httpx journalise chaque requête en INFO : les métriques par hôte suffisent
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Bornes des buckets de latence (ms), le dernier bucket est ouvert
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+RETRY_STATUS = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class LatencyHistogram:
+    """Histogramme de latence (buckets fixes en ms)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.counts[index] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Borne haute du bucket contenant le quantile q (ms)"""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+                return round(min(float(bound), self.max_ms), 1)
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 1) if self.total else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip([f"<={b}" for b in LATENCY_BUCKETS_MS] + ["inf"], self.counts))
+        }
+
+
+class HTTPClient:
+    """httpx.Client partagé (thread-safe) avec limites, retries et métriques par hôte"""
+
+    def __init__(self, http2: bool = True, max_connections: int = 64, max_keepalive: int = 32,
+                 keepalive_expiry: float = 30, global_limit: int = 32, per_host_limit: int = 6,
+                 host_limits: Dict[str, int] = None, retries: int = 2, backoff: float = 0.5,
+                 backoff_max: float = 8.0):
+        """
+        Initialise le client
+
+        Args:
+            http2: Négocie HTTP/2 (ALPN) avec les serveurs HTTPS qui le proposent
+            max_connections: Connexions ouvertes max (tous hôtes)
+            max_keepalive: Connexions gardées ouvertes entre deux requêtes
+            keepalive_expiry: Durée de vie d'une connexion inactive (s)
+            global_limit: Requêtes simultanées max (tous hôtes)
+            per_host_limit: Requêtes simultanées max par hôte
+            host_limits: Limites propres à certains hôtes {"localhost:11434": 8}
+            retries: Nouvelles tentatives (erreurs de connexion, 429/5xx sur méthodes idempotentes)
+            backoff: Base du backoff exponentiel (s)
+            backoff_max: Attente max entre deux tentatives (s)
+        """
+        self.http2 = http2
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.client = httpx.Client(
+            http2=http2,
+            follow_redirects=False,  # Les redirections sont gérées par requests
+            limits=self.limits
+        )
+        self.global_slots = threading.BoundedSemaphore(global_limit)
+        self.per_host_limit = per_host_limit
+        self.host_limits = host_limits or {}
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._host_slots = {}
+        self._variants = {}  # (verify, cert, proxy) -> httpx.Client
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: httpx.Request, stream: bool = False, retry_non_idempotent: bool = False,
+             via: httpx.Client = None) -> httpx.Response:
+        """
+        Envoie une requête (limites, retries, histogramme)
+
+        Args:
+            stream: Corps lu à la demande ; l'emplacement de l'hôte est libéré à response.close()
+            retry_non_idempotent: Retente aussi un POST sur 429/5xx
+            via: Client httpx à utiliser (voir variant()), self.client par défaut
+
+        Returns:
+            httpx.Response ; lève les exceptions httpx
+        """
+        host = request.url.netloc.decode("ascii")
+        host_slots = self._slots(host)
+        # Attente d'un emplacement bornée par le timeout "pool" de la requête
+        wait = request.extensions.get("timeout", {}).get("pool")
+        deadline = time.monotonic() + wait if wait is not None else None
+        # timeout=None : attente sans limite (Semaphore.acquire(timeout=-1) n'attendrait pas)
+        if not self.global_slots.acquire(timeout=wait):
+            raise httpx.PoolTimeout(f"{host}: limite globale de requêtes atteinte", request=request)
+        remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        if not host_slots.acquire(timeout=remaining):
+            self.global_slots.release()
+            raise httpx.PoolTimeout(f"{host}: limite de requêtes par hôte atteinte", request=request)
+        released = []
+
+        def release():
+            if not released:
+                released.append(True)
+                host_slots.release()
+                self.global_slots.release()
+
+        try:
+            response = self._send_with_retries(host, request, retry_non_idempotent, via or self.client)
+        except BaseException:
+            release()
+            raise
+        if not stream:
+            try:
+                response.read()
+            finally:
+                response.close()
+                release()
+            return response
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    def stats(self) -> Dict[str, Dict]:
+        """Par hôte : requêtes, retries, erreurs, version HTTP et histogramme de latence (jusqu'aux headers)"""
+        with self._lock:
+            return {host: dict(stats, latency=stats["latency"].summary()) for host, stats in self._stats.items()}
+
+    def variant(self, verify=True, cert=None, proxy: str = None) -> httpx.Client:
+        """Client httpx pour d'autres réglages TLS/proxy (verify, cert, proxies de requests), créé une seule fois"""
+        if verify is True and cert is None and proxy is None:
+            return self.client
+        key = (verify, cert, proxy)
+        with self._lock:
+            if key not in self._variants:
+                if isinstance(verify, str):
+                    # Chemin d'un bundle CA (REQUESTS_CA_BUNDLE) : fichier ou dossier de certificats
+                    verify = (ssl.create_default_context(capath=verify) if os.path.isdir(verify)
+                              else ssl.create_default_context(cafile=verify))
+                transport = httpx.HTTPTransport(verify=verify, cert=cert, http2=self.http2, limits=self.limits,
+                                                proxy=httpx.Proxy(proxy) if proxy else None)
+                self._variants[key] = httpx.Client(transport=transport, follow_redirects=False)
+            return self._variants[key]
+
+    def close(self):
+        self.client.close()
+        with self._lock:
+            variants, self._variants = list(self._variants.values()), {}
+        for client in variants:
+            client.close()
+
+    def _send_with_retries(self, host: str, request: httpx.Request, retry_non_idempotent: bool,
+                           client: httpx.Client) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS or retry_non_idempotent
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = client.send(request, stream=True)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Rien n'a été envoyé : on peut retenter quelle que soit la méthode
+                retry_after = None
+                error = e
+            except (httpx.ReadTimeout, httpx.RemoteProtocolError) as e:
+                if not idempotent:
+                    self._record(host, None, error=True)
+                    raise
+                retry_after = None
+                error = e
+            else:
+                self._record(host, (time.monotonic() - start) * 1000, version=response.http_version)
+                if response.status_code not in RETRY_STATUS or not idempotent or attempt >= self.retries:
+                    return response
+                retry_after = self._retry_after(response)
+                error = None
+                response.close()
+
+            if error is not None:
+                self._record(host, None, error=True)
+                if attempt >= self.retries:
+                    raise error
+            attempt += 1
+            delay = self._delay(attempt, retry_after)
+            with self._lock:
+                self._stats[host]["retries"] += 1
+            logger.debug(f"🔁 {host}: tentative {attempt + 1} dans {delay:.2f}s ({error or 'HTTP'})")
+            time.sleep(delay)
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full jitter : aléatoire entre 0 et base * 2^tentative (Retry-After prioritaire)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _slots(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.host_limits.get(host, self.per_host_limit))
+                self._stats[host] = {"requests": 0, "retries": 0, "errors": 0, "http_version": None,
+                                     "latency": LatencyHistogram()}
+            return self._host_slots[host]
+
+    def _record(self, host: str, ms: Optional[float], version: str = None, error: bool = False):
+        with self._lock:
+            stats = self._stats[host]
+            stats["requests"] += 1
+            if error:
+                stats["errors"] += 1
+            if ms is not None:
+                stats["latency"].add(ms)
+            if version:
+                stats["http_version"] = version
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Flux de réponse qui libère l'emplacement de l'hôte à la fermeture"""
+
+    def __init__(self, inner, release):
+        self.inner = inner
+        self.release = release
+
+    def __iter__(self):
+        yield from self.inner
+
+    def close(self):
+        try:
+            self.inner.close()
+        finally:
+            self.release()
+
+
+class _RawBody:
+    """Corps de réponse lu à la demande, au format attendu par requests (raw.read)"""
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+        self._done = False
+
+    def read(self, amt: int = None, **kwargs) -> bytes:
+        try:
+            while not self._done and (amt is None or len(self._buffer) < amt):
+                try:
+                    self._buffer += next(self._chunks)
+                except StopIteration:
+                    self._done = True
+        except httpx.TimeoutException as e:
+            raise requests.ConnectionError(e)
+        except httpx.HTTPError as e:
+            raise requests.ConnectionError(e)
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def stream(self, amt: int = None, decode_content: bool = None):
+        """Morceaux du corps dès leur arrivée (iter_content/iter_lines), sans attendre `amt` octets"""
+        if self._buffer:
+            data, self._buffer = self._buffer, b""
+            yield data
+        try:
+            while not self._done:
+                try:
+                    chunk = next(self._chunks)
+                except StopIteration:
+                    self._done = True
+                    break
+                if chunk:
+                    yield chunk
+        except httpx.HTTPError as e:
+            raise requests.ConnectionError(e)
+
+    def close(self):
+        self.response.close()
+
+    def release_conn(self):
+        self.response.close()
+
+
+class HTTPXAdapter(BaseAdapter):
+    """Adapter requests -> HTTPClient : les sessions requests existantes profitent du client partagé"""
+
+    def __init__(self, client: HTTPClient):
+        super().__init__()
+        self.client = client
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        # Même sémantique que requests : (connexion, lecture), un nombre, ou None = pas de timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(connect=connect, read=read, write=read, pool=read)
+        else:
+            timeout = httpx.Timeout(timeout)
+        headers = {k: v for k, v in request.headers.items() if k.lower() != "connection"}
+        body = request.body
+        if body is not None and not isinstance(body, (bytes, str)):
+            body = b"".join(part if isinstance(part, bytes) else part.encode() for part in body)
+        outgoing = self.client.client.build_request(request.method, request.url, headers=headers, content=body,
+                                                    timeout=timeout)
+        # verify/cert/proxies de requests (REQUESTS_CA_BUNDLE, HTTPS_PROXY... déjà résolus par la session)
+        if isinstance(cert, list):
+            cert = tuple(cert)
+        via = self.client.variant(verify=verify, cert=cert, proxy=select_proxy(request.url, proxies or {}))
+
+        try:
+            response = self.client.send(outgoing, stream=True, via=via)
+        except httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(e, request=request)
+        except httpx.ReadTimeout as e:
+            raise requests.ReadTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+
+        built = requests.Response()
+        built.status_code = response.status_code
+        built.headers = CaseInsensitiveDict(response.headers.items())
+        built.encoding = get_encoding_from_headers(built.headers)
+        built.reason = response.reason_phrase
+        built.url = request.url
+        built.request = request
+        built.connection = self
+        built.raw = _RawBody(response)
+        if not stream:
+            built.content  # Lit tout le corps puis libère la connexion
+            response.close()
+        return built
+
+    def close(self):
+        pass
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def configure(config: Dict = None) -> HTTPClient:
+    """(Re)crée le client partagé depuis la section "http" de config.json"""
+    global _shared_client
+    config = config or {}
+    with _shared_lock:
+        _shared_client = HTTPClient(
+            http2=config.get("http2", True),
+            max_connections=config.get("max_connections", 64),
+            max_keepalive=config.get("max_keepalive", 32),
+            keepalive_expiry=config.get("keepalive_expiry", 30),
+            global_limit=config.get("global_limit", 32),
+            per_host_limit=config.get("per_host_limit", 6),
+            host_limits=config.get("host_limits"),
+            retries=config.get("retries", 2),
+            backoff=config.get("backoff", 0.5),
+            backoff_max=config.get("backoff_max", 8.0)
+        )
+    return _shared_client
+
+
+def shared_client() -> HTTPClient:
+    """Client partagé du process (configuration par défaut si configure() n'a pas été appelé)"""
+    with _shared_lock:
+        client = _shared_client
+    return client or configure()
+
+
+def mount_shared(session: requests.Session) -> requests.Session:
+    """Fait passer une session requests par le client partagé"""
+    adapter = HTTPXAdapter(shared_client())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def shared_session() -> requests.Session:
+    """Nouvelle session requests branchée sur le client partagé (cookies/headers propres, connexions communes)"""
+    return mount_shared(requests.Session())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - JSON Sources
+Adapters natifs pour les APIs JSON (dev.to, listings Reddit .json) :
+mapping des champs vers le format article, pagination et curseur "since"
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from source_adapters import BatchedSourceAdapter, register_source
+
+logger = logging.getLogger(__name__)
+
+_cursor_lock = threading.Lock()
+
+
+def get_path(item: Dict, path: str, default=None):
+    """Lit un champ par chemin pointé ("user.name")"""
+    value = item
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+def epoch_to_iso(value) -> str:
+    return datetime.fromtimestamp(float(value), tz=timezone.utc).isoformat()
+
+
+def iso_to_epoch(value: str) -> float:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def map_item(item: Dict, field_map: Dict) -> Dict:
+    """Applique un mapping {champ article: chemin JSON ou fonction(item)}"""
+    article = {}
+    for field, spec in field_map.items():
+        value = spec(item) if callable(spec) else get_path(item, spec, "")
+        article[field] = value if value is not None else ""
+    return article
+
+
+# Mapping générique pour un flux JSON inconnu (ex: URL de RSS_FEEDS qui répond en JSON)
+GENERIC_FIELDS = {
+    "title": lambda i: i.get("title") or i.get("name", ""),
+    "summary": lambda i: i.get("description") or i.get("summary") or i.get("content_text", ""),
+    "link": lambda i: i.get("url") or i.get("link", ""),
+    "published": lambda i: i.get("published_at") or i.get("date_published") or i.get("published", "")
+}
+
+
+def parse_json_feed(payload) -> Dict:
+    """Convertit une réponse JSON quelconque en {"title", "entries"} comme un flux RSS"""
+    if isinstance(payload, dict):
+        items = payload.get("items") or payload.get("articles") or payload.get("data") or []
+        title = payload.get("title", "Unknown")
+    else:
+        items, title = payload, "Unknown"
+    entries = [map_item(item, GENERIC_FIELDS) for item in items if isinstance(item, dict)]
+    return {"title": title, "entries": entries}
+
+
+class CursorStore:
+    """Curseurs "since" par endpoint (timestamp du plus récent item vu), persistés en JSON"""
+
+    def __init__(self, path: str = "data/json_cursors.json"):
+        self.path = path
+
+    def get(self, key: str) -> float:
+        with _cursor_lock:
+            return self._load().get(key, 0.0)
+
+    def set(self, key: str, value: float):
+        with _cursor_lock:
+            cursors = self._load()
+            cursors[key] = max(value, cursors.get(key, 0.0))
+            cursor_dir = os.path.dirname(self.path)
+            if cursor_dir:
+                os.makedirs(cursor_dir, exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump(cursors, f, indent=2)
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+class JSONSourceAdapter(BatchedSourceAdapter):
+    """Source JSON paginée : une requête par page, arrêt au curseur "since" """
+
+    source_name = "JSON"
+    max_pages = 3
+    field_map: Dict = {}
+
+    def __init__(self, scraper, **overrides):
+        super().__init__(scraper, **overrides)
+        self.max_pages = overrides.get("max_pages", self.max_pages)
+        self.cursors = CursorStore(scraper.config.get("json_cursors", "data/json_cursors.json"))
+        self.window_hours = scraper.config.get("json_window_hours", 24)
+
+    def iter_batches(self) -> Iterator[List[Dict]]:
+        """Un lot par page, jusqu'au curseur, à la fenêtre de temps ou à max_pages"""
+        since = max(self.cursors.get(self.name), time.time() - self.window_hours * 3600)
+        newest = 0.0
+        page_token = None
+
+        for page in range(self.max_pages):
+            payload = self.request_page(page, page_token)
+            items = self.extract_items(payload)
+            if not items:
+                break
+
+            articles = [self.to_article(item) for item in items]
+            timestamps = [iso_to_epoch(article["published"]) for article in articles]
+            newest = max([newest] + timestamps)
+            yield articles
+
+            # Page suivante inutile si on a atteint les items déjà vus
+            page_token = self.next_page_token(payload, items)
+            if page_token is None or min(timestamps) <= since:
+                break
+
+        if newest:
+            self.cursors.set(self.name, newest)
+
+    def request_page(self, page: int, page_token: Optional[str]):
+        """GET d'une page sur la session HTTP partagée du scraper"""
+        fetcher = self.scraper.fetcher
+        response = fetcher.session.get(
+            self.page_url(page, page_token),
+            timeout=(fetcher.connect_timeout, fetcher.read_timeout)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def to_article(self, item: Dict) -> Dict:
+        article = map_item(item, self.field_map)
+        article.setdefault("source", self.source_name)
+        article["type"] = "json"
+        return article
+
+    @abstractmethod
+    def page_url(self, page: int, page_token: Optional[str]) -> str:
+        """URL de la page `page` (jeton `page_token` de la page précédente)"""
+
+    def extract_items(self, payload) -> List[Dict]:
+        return payload if isinstance(payload, list) else []
+
+    def next_page_token(self, payload, items: List[Dict]) -> Optional[str]:
+        """Jeton de la page suivante (None = dernière page)"""
+        return ""
+
+
+@register_source
+class DevToAdapter(JSONSourceAdapter):
+    name = "devto"
+    label = "💻 Scraping dev.to (JSON)..."
+    source_name = "DEV Community"
+    cost = 1
+    timeout = 20.0
+    priority = 70
+    max_pages = 3
+
+    API_URL = "https://dev.to/api/articles"
+    TAG = "3dprinting"
+    PER_PAGE = 30
+
+    field_map = {
+        "title": "title",
+        "content": "description",
+        "link": "url",
+        "published": "published_at",
+        "author": "user.name"
+    }
+
+    def page_url(self, page: int, page_token: Optional[str]) -> str:
+        return f"{self.API_URL}?tag={self.TAG}&per_page={self.PER_PAGE}&page={page + 1}"
+
+    def next_page_token(self, payload, items: List[Dict]) -> Optional[str]:
+        return "" if len(items) >= self.PER_PAGE else None
+
+
+@register_source
+class RedditAdapter(JSONSourceAdapter):
+    name = "reddit"
+    label = "🔗 Scraping Reddit (JSON)..."
+    source_name = "Reddit"
+    cost = 1
+    timeout = 20.0
+    priority = 60
+    max_pages = 2
+
+    LIMIT = 100
+
+    field_map = {
+        "title": "data.title",
+        "content": "data.selftext",
+        "link": lambda i: f"https://www.reddit.com{get_path(i, 'data.permalink', '')}",
+        "published": lambda i: epoch_to_iso(get_path(i, "data.created_utc", 0)),
+        "source": lambda i: f"reddit r/{get_path(i, 'data.subreddit', '')}",
+        "upvotes": "data.score"
+    }
+
+    def page_url(self, page: int, page_token: Optional[str]) -> str:
+        # Un seul listing combiné pour tous les subreddits (r/a+b+c)
+        subreddits = []
+        for subreddit in self.scraper.REDDIT_SUBREDDITS:
+            name = subreddit.split("/", 1)[-1]
+            if name.lower() not in [s.lower() for s in subreddits]:
+                subreddits.append(name)
+        url = f"https://www.reddit.com/r/{'+'.join(subreddits)}/new.json?limit={self.LIMIT}&raw_json=1"
+        return f"{url}&after={page_token}" if page_token else url
+
+    def extract_items(self, payload) -> List[Dict]:
+        return get_path(payload, "data.children", []) if isinstance(payload, dict) else []
+
+    def next_page_token(self, payload, items: List[Dict]) -> Optional[str]:
+        return get_path(payload, "data.after")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - LLM Response Cache
+Cache persistant (SQLite) des réponses Ollama, adressé par le hash du modèle,
+du prompt et des options : relancer la pipeline après un échec en aval ne
+refait pas les inférences. TTL, éviction LRU par taille et statistiques.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Réponses LLM par clé de contenu (modèle + prompt + options)"""
+
+    def __init__(self, db_path: str = "data/llm_cache.db", ttl_hours: float = 72,
+                 max_mb: float = 50, bypass: bool = False):
+        """
+        Initialise le cache
+
+        Args:
+            db_path: Fichier SQLite
+            ttl_hours: Durée de validité d'une réponse (h)
+            max_mb: Taille max des réponses gardées (Mo), éviction LRU au-delà
+            bypass: Ignore le cache en lecture (les nouvelles réponses sont quand même enregistrées)
+        """
+        self.db_path = db_path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.bypass = bypass
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0, "bypassed": 0}
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, prompt: str, options: Dict = None, **params) -> str:
+        """Hash stable du modèle, du prompt et des options de génération"""
+        material = json.dumps({"model": model, "prompt": prompt, "options": options or {}, "params": params},
+                              sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Résultat en cache (None si absent, expiré ou cache contourné)"""
+        if self.bypass:
+            self.counters["bypassed"] += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT payload, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            payload, created_at = row
+            if now - created_at > self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.counters["hits"] += 1
+        return json.loads(payload)
+
+    def put(self, key: str, model: str, result: Dict):
+        """Enregistre un résultat puis évince les entrées les moins récemment lues"""
+        payload = json.dumps(result, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload.encode("utf-8")), now, now)
+            )
+            self.counters["stores"] += 1
+            self._evict()
+            self.conn.commit()
+
+    def stats(self) -> Dict:
+        """Compteurs du run + taille actuelle du cache"""
+        with self._lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return dict(self.counters, entries=entries, size_mb=round(size / 1024 / 1024, 2),
+                    hit_rate=round(self.counters["hits"] / lookups, 3) if lookups else 0.0)
+
+    def _evict(self):
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.counters["evictions"] += 1
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - LLM Output Schemas
+Schémas JSON envoyés à Ollama (paramètre "format", sorties structurées),
+validation/normalisation des réponses et compteurs de réussite par modèle
+"""
+
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "technical_points": {"type": "array", "items": {"type": "string"}},
+        "market_impact": {"type": "string"},
+        "relevance_score": {"type": "integer", "minimum": 0, "maximum": 10},
+        "keywords": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["summary", "technical_points", "market_impact", "relevance_score", "keywords"]
+}
+
+ANIMATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "emotions": {"type": "array", "items": {"type": "string"}},
+        "gestures": {"type": "array", "items": {"type": "string"}},
+        "head_movements": {"type": "string"},
+        "hand_animations": {"type": "array", "items": {"type": "string"}},
+        "timing": {"type": "object"},
+        "segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string"},
+                    "emotion": {"type": "string"},
+                    "gesture": {"type": "string"},
+                    "head_movement": {"type": "string"}
+                },
+                "required": ["text", "emotion", "gesture", "head_movement"]
+            }
+        }
+    },
+    "required": ["emotions", "gestures", "head_movements", "segments"]
+}
+
+# Extraction + indices d'animation en une seule génération
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": dict(EXTRACTION_SCHEMA["properties"], animation=ANIMATION_SCHEMA),
+    "required": EXTRACTION_SCHEMA["required"] + ["animation"]
+}
+
+
+def parse_json_object(text: str) -> Optional[Dict]:
+    """Premier objet JSON du texte (None si aucun objet valide)"""
+    start, end = text.find("{"), text.rfind("}") + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        value = json.loads(text[start:end])
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def validate(value, schema: Dict, path: str = "") -> Tuple[object, List[str]]:
+    """
+    Valide une valeur contre un sous-ensemble de JSON Schema (object, array, string,
+    integer, number, bornes) en corrigeant les écarts sans ambiguïté ("7" -> 7, "a, b" -> ["a", "b"])
+
+    Returns:
+        (valeur normalisée, erreurs)
+    """
+    kind = schema.get("type")
+    name = path or "root"
+
+    if kind == "object":
+        if not isinstance(value, dict):
+            return value, [f"{name}: objet attendu"]
+        errors = []
+        cleaned = dict(value)
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                cleaned[key], sub_errors = validate(value[key], sub_schema, f"{path}.{key}" if path else key)
+                errors.extend(sub_errors)
+            elif key in schema.get("required", []):
+                errors.append(f"{key}: champ manquant")
+        return cleaned, errors
+
+    if kind == "array":
+        if isinstance(value, str):
+            value = [part.strip() for part in value.split(",") if part.strip()]
+        if not isinstance(value, list):
+            return value, [f"{name}: liste attendue"]
+        cleaned, errors = [], []
+        for i, item in enumerate(value):
+            item, item_errors = validate(item, schema.get("items", {}), f"{name}[{i}]")
+            cleaned.append(item)
+            errors.extend(item_errors)
+        return cleaned, errors
+
+    if kind == "string":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), []
+        if not isinstance(value, str):
+            return value, [f"{name}: texte attendu"]
+        return value, []
+
+    if kind in ("integer", "number"):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return value, [f"{name}: nombre attendu"]
+        if kind == "integer":
+            number = int(round(number))
+        if "minimum" in schema:
+            number = max(schema["minimum"], number)
+        if "maximum" in schema:
+            number = min(schema["maximum"], number)
+        return number, []
+
+    return value, []
+
+
+class SchemaCounters:
+    """Réussite des sorties structurées par modèle (premier essai, réparées, échouées)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models = {}
+
+    def record(self, model: str, outcome: str):
+        """outcome: "valid", "repaired" ou "failed" """
+        with self._lock:
+            counts = self.models.setdefault(model, {"valid": 0, "repaired": 0, "failed": 0})
+            counts[outcome] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Compteurs + taux de réussite (valid + repaired) / total par modèle"""
+        with self._lock:
+            result = {}
+            for model, counts in self.models.items():
+                total = sum(counts.values())
+                result[model] = dict(counts, total=total,
+                                     success_rate=round((counts["valid"] + counts["repaired"]) / total, 3),
+                                     first_try_rate=round(counts["valid"] / total, 3))
+            return result
+
+
+# Compteurs partagés par tout le process
+SCHEMA_COUNTERS = SchemaCounters()
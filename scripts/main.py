@@ -8,6 +8,8 @@ import os
 import json
 import sys
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -33,8 +35,34 @@ class JT3DOrchestrator:
         self.config_path = config_path
         self.config = self._load_config()
         self.start_time = datetime.now()
+        self.scraper = None
+        self.pipeline_config = self.config.get("pipeline", {})
+        self._early_extractions = {}
+        self._ollama = None
+        self._model_lifecycle = None
+        self._model = None
+        self._generation_slots = None
+        self._durations = None
+        self._configure_http()
         logger.info("🎬 JT 3D Orchestrator FINAL VERSION démarré")
     
+    def _configure_http(self):
+        """Client HTTP partagé (scraper, Ollama, Telegram) depuis la section "http" de la config"""
+        import sys
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+        from http_client import configure
+        
+        configure(self.config.get("http", {}))
+    
+    def _log_http_stats(self):
+        from http_client import shared_client
+        
+        for host, stats in sorted(shared_client().stats().items(), key=lambda item: -item[1]["requests"]):
+            latency = stats["latency"]
+            logger.info(f"🌐 {host} ({stats['http_version']}): {stats['requests']} requêtes, "
+                        f"p50 {latency['p50_ms']:.0f}ms, p95 {latency['p95_ms']:.0f}ms, "
+                        f"{stats['retries']} retries, {stats['errors']} erreurs")
+    
     def _load_config(self) -> dict:
         """Charge la configuration"""
         try:
@@ -57,6 +85,9 @@ class JT3DOrchestrator:
             logger.info("🎬 JT 3D PIPELINE COMPLÈTE DÉMARRÉE (VERSION FINALE)")
             logger.info("="*70 + "\n")
             
+            # Chargement du modèle Ollama pendant le scraping
+            self._warm_up_model()
+            
             # ÉTAPE 1 : SCRAPER
             logger.info("🔍 ÉTAPE 1 : Scraper les news (40+ sources)...")
             news = self._scrape_news()
@@ -68,10 +99,11 @@ class JT3DOrchestrator:
             
             # ÉTAPE 2 : OLLAMA EXTRACTION
             logger.info("📊 ÉTAPE 2 : Extraire infos avec Ollama (Llama 3.1 8B local)...")
-            extracted = self._extract_with_ollama(news[0])
+            extracted = self._extract_news(news)
             if not extracted:
                 logger.error("❌ Extraction échouée")
                 return
+            self._archive_extraction(news[0], extracted)
             logger.info(f"✅ Infos extraites")
             logger.info(f"   Summary: {extracted['summary'][:60]}...\n")
             
@@ -82,7 +114,7 @@ class JT3DOrchestrator:
                 logger.error("❌ Génération échouée")
                 return
             logger.info(f"✅ Script généré")
-            logger.info(f"   Durée: {script.get('duration', 0)}s\n")
+            logger.info(f"   Durée: {script.get('total_duration', script.get('duration', 0))}s\n")
             
             # ÉTAPE 4 : TTS
             logger.info("🎤 ÉTAPE 4 : Générer TTS (Google Cloud)...")
@@ -92,6 +124,9 @@ class JT3DOrchestrator:
                 return
             logger.info(f"✅ Audio généré: {audio_file}\n")
             
+            # Plus d'appel Ollama : la RAM du modèle va au rendu
+            self._unload_model()
+            
             # ÉTAPE 5 : BLENDER RENDERING
             logger.info("🎬 ÉTAPE 5 : Rendu Blender (1080x1920 @ 30fps)...")
             video_file = self._render_blender(script, audio_file)
@@ -105,6 +140,12 @@ class JT3DOrchestrator:
             self._upload_video(video_file)
             logger.info(f"✅ Upload simulé (placeholder)\n")
             
+            # News publiée : ne sera plus re-sélectionnée aux prochains runs
+            self._mark_published(news[0])
+            
+            self._log_llm_cache_stats()
+            self._log_http_stats()
+            
             elapsed = (datetime.now() - self.start_time).total_seconds()
             logger.info("="*70)
             logger.info(f"✅✅✅ PIPELINE COMPLÈTE EN {elapsed:.1f}s ! 🎉")
@@ -126,8 +167,13 @@ class JT3DOrchestrator:
             sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
             from scraper_complete import JT3DScraper
             
-            scraper = JT3DScraper()
-            news = scraper.scrape_all_sources(hours=24)
+            scraper = JT3DScraper(self.config.get("scraper", {}))
+            scraper.relevance = self._make_relevance()
+            self.scraper = scraper
+            if self.pipeline_config.get("streaming", True):
+                news = self._scrape_news_streaming(scraper)
+            else:
+                news = scraper.scrape_all_sources(hours=24)
             
             if news:
                 logger.info(f"   ✅ Trouvé {len(news)} articles")
@@ -140,6 +186,96 @@ class JT3DOrchestrator:
             logger.warning(f"   ⚠️ Scraper failed: {e}, using test data")
             return self._default_news()
     
+    def _make_relevance(self):
+        """EmbeddingRelevance si ollama.embedding_relevance est activé"""
+        ollama_config = self.config.get("ollama", {})
+        if not (ollama_config.get("enabled", True) and ollama_config.get("embedding_relevance", False)):
+            return None
+        from embedding_relevance import EmbeddingRelevance, VectorCache
+        
+        return EmbeddingRelevance(
+            self._ollama_client(),
+            model=ollama_config.get("embedding_model", "nomic-embed-text"),
+            cache=VectorCache(ollama_config.get("embedding_cache_db", "data/embeddings.db")),
+            topics=ollama_config.get("relevance_topics"),
+            off_topics=ollama_config.get("relevance_off_topics"),
+            min_similarity=ollama_config.get("relevance_min_similarity", 0.45),
+            timeout=ollama_config.get("embedding_timeout", 10)
+        )
+    
+    def _scrape_news_streaming(self, scraper) -> list:
+        """Scrape en streaming et lance l'extraction Ollama du leader sans attendre la fin"""
+        top_k = self.pipeline_config.get("stream_top_k", 5)
+        min_score = self.pipeline_config.get("stream_min_score", 30)
+        
+        # Un seul worker : Ollama traite une requête à la fois
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="early-extract")
+        self._early_extractions = {}
+        
+        event = {"ranking": []}
+        for event in scraper.scrape_iter(hours=24, top_k=top_k):
+            if not event["top"]:
+                continue
+            leader = event["top"][0]
+            key = self._story_key(leader)
+            if leader.get("score", 0) < min_score or not leader.get("relevant", True) or key in self._early_extractions:
+                continue
+            
+            # Nouveau leader : les extractions pas encore démarrées sont obsolètes
+            for future in self._early_extractions.values():
+                future.cancel()
+            logger.info(f"   🚀 Extraction anticipée: {leader['title'][:50]}... (score {leader['score']})")
+            self._early_extractions[key] = executor.submit(self._extract_early, scraper, leader)
+        
+        executor.shutdown(wait=False)
+        return event["ranking"]
+    
+    def _extract_early(self, scraper, leader: dict) -> dict:
+        """Texte complet puis extraction Ollama du leader (thread d'extraction anticipée)"""
+        try:
+            scraper.fetch_full_text([leader])
+        except Exception as e:
+            logger.warning(f"   ⚠️ Full-text failed: {e}")
+        return self._extract_with_ollama(self._with_context(leader))
+    
+    def _with_context(self, news: dict) -> dict:
+        """Ajoute à la news les histoires liées des derniers jours (archive du scraper)"""
+        if not self.scraper or "related" in news:
+            return news
+        try:
+            news["related"] = self.scraper.related_stories(news)
+            if news["related"]:
+                logger.info(f"   🗄️ {len(news['related'])} histoires liées dans l'archive")
+        except Exception as e:
+            logger.warning(f"   ⚠️ Archive lookup failed: {e}")
+        return news
+    
+    def _archive_extraction(self, news: dict, extracted: dict):
+        """Indexe les mots-clés extraits avec la news dans l'archive"""
+        if not self.scraper or not extracted.get("keywords"):
+            return
+        self.scraper.archive_articles([dict(news, keywords=extracted["keywords"])])
+    
+    def _take_early_extraction(self, news: dict) -> dict:
+        """Résultat de l'extraction anticipée si elle concerne cette news"""
+        future = self._early_extractions.pop(self._story_key(news), None)
+        if future is None or future.cancelled():
+            return None
+        return future.result()
+    
+    @staticmethod
+    def _story_key(news: dict) -> tuple:
+        return (news.get("title", ""), news.get("link", ""))
+    
+    def _mark_published(self, news: dict):
+        """Enregistre la news publiée dans le seen store du scraper"""
+        if not self.scraper:
+            return
+        try:
+            self.scraper.mark_processed([news])
+        except Exception as e:
+            logger.warning(f"   ⚠️ Seen store update failed: {e}")
+    
     def _default_news(self) -> list:
         """News par défaut pour test"""
         return [{
@@ -149,16 +285,189 @@ class JT3DOrchestrator:
             "date": datetime.now().isoformat()
         }]
     
-    def _extract_with_ollama(self, news: dict) -> dict:
-        """Extrait infos avec Ollama RÉEL"""
-        logger.info("   🤖 Appelant Ollama Llama 3.1 8B...")
+    def _extract_news(self, news: list) -> dict:
+        """
+        Extrait la news à publier
+        
+        Avec ollama.extract_top_k > 1, les k meilleures news sont extraites en parallèle
+        et la plus pertinente selon Ollama passe en tête de la liste `news`.
+        """
+        top_k = min(self.config.get("ollama", {}).get("extract_top_k", 1), len(news))
         
+        # Pas d'extraction pour les news jugées hors sujet par les embeddings
+        relevant = sum(1 for n in news[:top_k] if n.get("relevant", True))
+        if relevant < top_k:
+            logger.info(f"   🧭 {top_k - relevant} news hors sujet non extraites")
+            top_k = max(1, relevant)
+        if top_k <= 1:
+            # Une seule news : extraction et indices d'animation dans la même génération (mode combiné)
+            extracted = self._take_early_extraction(news[0]) or \
+                self._extract_with_ollama(self._with_context(news[0]), animation=True)
+            return self._with_animation(extracted)
+        
+        candidates = news[:top_k]
+        results = {}
+        early = self._take_early_extraction(news[0])
+        if early:
+            results[0] = early
+        pending = [i for i in range(top_k) if i not in results]
+        
+        try:
+            ollama_config = self.config.get("ollama", {})
+            extractor = self._make_extractor()
+            batch = [self._with_context(candidates[i]) for i in pending]
+            for index, extracted in extractor.extract_many(batch, k=len(batch),
+                                                           deadline=ollama_config.get("batch_deadline", 900)):
+                results[pending[index]] = extracted
+        except Exception as e:
+            logger.warning(f"   ⚠️ Batch extraction failed: {e}")
+        
+        if not results:
+            return self._default_extraction(news[0])
+        
+        def rank(i):
+            try:
+                relevance = float(results[i].get("relevance_score", 0))
+            except (TypeError, ValueError):
+                relevance = 0.0
+            return (not results[i].get("stats", {}).get("error"), relevance, candidates[i].get("score", 0))
+        
+        best = max(results, key=rank)
+        if best:
+            logger.info(f"   🏆 News retenue: {candidates[best]['title'][:50]}... (pertinence Ollama)")
+            news.insert(0, news.pop(best))
+        return self._with_animation(results[best])
+    
+    def _with_animation(self, extracted: dict) -> dict:
+        """Indices d'animation de la seule news retenue (ollama.combined_analysis), si l'extraction ne les a pas"""
+        if not self.config.get("ollama", {}).get("combined_analysis", False) or "animation" in extracted:
+            return extracted
         try:
+            extracted["animation"] = self._make_extractor().animate(extracted)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Animation cues failed: {e}")
+        return extracted
+    
+    def _make_extractor(self, animation: bool = False):
+        """OllamaNewsExtractor configuré depuis la section "ollama" de la config
+
+        animation=True active le mode combiné (si ollama.combined_analysis) : à réserver à la news publiée,
+        les extractions des candidates n'en ont pas besoin.
+        """
+        import sys
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+        from ollama_extractor import OllamaNewsExtractor
+        
+        ollama_config = self.config.get("ollama", {})
+        # num_parallel est par hôte : le batch s'étend à tout le pool
+        num_parallel = ollama_config.get("num_parallel", 1) * len(self._ollama_client().pool)
+        if self._generation_slots is None:
+            # Partagé par tous les extracteurs (anticipé, batch, map) : jamais plus que le pool ne sert
+            self._generation_slots = threading.BoundedSemaphore(num_parallel)
+        return OllamaNewsExtractor(
+            model=self._ollama_model(),
+            num_ctx=ollama_config.get("num_ctx", 4096),
+            num_parallel=num_parallel,
+            slots=self._generation_slots,
+            client=self._ollama_client(),
+            stream=ollama_config.get("stream", True),
+            token_budget=ollama_config.get("token_budget", 512),
+            structured=ollama_config.get("structured_output", True),
+            map_reduce=ollama_config.get("map_reduce", True),
+            chunk_tokens=ollama_config.get("chunk_tokens", 1024),
+            max_chunks=ollama_config.get("max_map_chunks", 6),
+            animation=animation and ollama_config.get("combined_analysis", False)
+        )
+    
+    def _ollama_model(self) -> str:
+        """Modèle de la config (ollama.model), le même pour le préchargement et les extractions"""
+        if self._model is None:
+            import sys
+            sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+            from ollama_extractor import DEFAULT_MODEL
+            
+            self._model = self.config.get("ollama", {}).get("model") or os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+        return self._model
+    
+    def _ollama_client(self):
+        """Client Ollama partagé par toute la pipeline (avec cache des réponses)"""
+        if self._ollama is None:
             import sys
             sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
-            from ollama_extractor import OllamaNewsExtractor
+            from llm_cache import LLMResponseCache
+            from ollama_client import OllamaClient
+            from ollama_pool import OllamaHostPool
+            
+            ollama_config = self.config.get("ollama", {})
+            pool = OllamaHostPool(
+                ollama_config.get("hosts") or ollama_config.get("host", "http://localhost:11434"),
+                max_failures=ollama_config.get("max_failures", 2),
+                eject_seconds=ollama_config.get("eject_seconds", 60),
+                health_interval=ollama_config.get("health_interval", 30)
+            )
+            cache = None
+            if ollama_config.get("cache", True):
+                cache = LLMResponseCache(
+                    db_path=ollama_config.get("cache_db", "data/llm_cache.db"),
+                    ttl_hours=ollama_config.get("cache_ttl_hours", 72),
+                    max_mb=ollama_config.get("cache_max_mb", 50),
+                    bypass=ollama_config.get("cache_bypass", False)
+                )
+            self._ollama = OllamaClient(pool, timeout=ollama_config.get("timeout", 300), cache=cache,
+                                        stall_timeout=ollama_config.get("stall_timeout", 60),
+                                        keep_alive=ollama_config.get("keep_alive", "30m"))
+        return self._ollama
+    
+    def _warm_up_model(self):
+        """Précharge le modèle Ollama en arrière-plan (keep_alive pour toute la pipeline)"""
+        if not self.config.get("ollama", {}).get("warm_up", True):
+            return
+        try:
+            client = self._ollama_client()
+            from ollama_client import ModelLifecycle
             
-            extractor = OllamaNewsExtractor()
+            self._model_lifecycle = ModelLifecycle(client, self._ollama_model())
+            self._model_lifecycle.warm_up()
+        except Exception as e:
+            logger.warning(f"   ⚠️ Warm-up Ollama impossible: {e}")
+    
+    def _unload_model(self):
+        """Décharge le modèle avant le rendu et affiche chargement vs inférence"""
+        if self._ollama is None:
+            return
+        totals = self._ollama.totals
+        logger.info(f"   ⏱️ Ollama: chargement {totals['load_seconds']:.1f}s, prefill {totals['prompt_seconds']:.1f}s, "
+                    f"génération {totals['eval_seconds']:.1f}s ({totals['requests']} requêtes)")
+        if len(self._ollama.pool) > 1:
+            for host, state in self._ollama.pool.stats().items():
+                logger.info(f"   🖥️ {host}: {state['requests']} requêtes, {state['errors']} échecs"
+                            f"{'' if state['healthy'] else ' (écarté)'}")
+        if self._model_lifecycle and self.config.get("ollama", {}).get("unload_before_render", True):
+            self._model_lifecycle.unload()
+            from prompt_builder import PREFILL_TRACKER
+            PREFILL_TRACKER.reset()
+    
+    def _log_llm_cache_stats(self):
+        if self._ollama is not None and self._ollama.cache is not None:
+            stats = self._ollama.cache.stats()
+            logger.info(f"♻️ Cache LLM: {stats['hits']} hits / {stats['misses']} misses "
+                        f"({stats['entries']} réponses, {stats['size_mb']} Mo)")
+        if self._ollama is not None:
+            from llm_schemas import SCHEMA_COUNTERS
+            for model, counts in SCHEMA_COUNTERS.summary().items():
+                logger.info(f"🧾 Sorties JSON {model}: {counts['success_rate']:.0%} valides "
+                            f"({counts['valid']} du premier coup, {counts['repaired']} réparées, {counts['failed']} perdues)")
+            from prompt_builder import PREFILL_TRACKER
+            if PREFILL_TRACKER.calls:
+                logger.info(f"🧠 Prefix système en cache: {PREFILL_TRACKER.saved_seconds:.1f}s de prefill économisées "
+                            f"sur {PREFILL_TRACKER.calls} extractions")
+    
+    def _extract_with_ollama(self, news: dict, animation: bool = False) -> dict:
+        """Extrait infos avec Ollama RÉEL"""
+        logger.info("   🤖 Appelant Ollama Llama 3.1 8B...")
+        
+        try:
+            extractor = self._make_extractor(animation)
             extracted = extractor.extract(news)
             
             if extracted:
@@ -185,6 +494,20 @@ class JT3DOrchestrator:
             "keywords": ["3D", "Printing", "Innovation"]
         }
     
+    def _duration_model(self):
+        """Estimation des durées parlées, recalibrée sur chaque audio TTS (section "tts")"""
+        if self._durations is None:
+            import sys
+            sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+            from duration_model import DurationModel
+            
+            tts_config = self.config.get("tts", {})
+            self._durations = DurationModel(
+                store_path=tts_config.get("duration_store", "data/tts_durations.json"),
+                min_samples=tts_config.get("duration_min_samples", 12)
+            )
+        return self._durations
+    
     def _generate_script_with_gemini(self, extracted: dict) -> dict:
         """Génère script avec Gemini RÉEL"""
         logger.info("   ✍️ Appelant Gemini...")
@@ -194,7 +517,10 @@ class JT3DOrchestrator:
             sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
             from script_generator import GeminiScriptGenerator
             
-            generator = GeminiScriptGenerator()
+            generator = GeminiScriptGenerator(
+                duration_model=self._duration_model(),
+                voice=self.config.get("tts", {}).get("voice", "denise")
+            )
             script = generator.generate_jt_script(extracted, duration=300)
             
             if script:
@@ -225,9 +551,12 @@ class JT3DOrchestrator:
         try:
             import sys
             sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
-            from tts_generator import JT3DTTSGenerator
+            from tts_generator import TTSGenerator
             
-            generator = JT3DTTSGenerator()
+            generator = TTSGenerator(
+                voice=self.config.get("tts", {}).get("voice", "denise"),
+                duration_model=self._duration_model()
+            )
             audio_file = generator.generate_from_script(script, output_file="data/audio.mp3")
             
             if audio_file:
@@ -274,7 +603,7 @@ class JT3DOrchestrator:
             from telegram_sender import TelegramSender
             
             sender = TelegramSender()
-            if sender.bot:
+            if sender.token:
                 sender.send_video(video_file, caption="🎬 JT 3D Printing News!")
                 logger.info("   ✅ Upload réussi!")
             else:
@@ -291,11 +620,14 @@ def main():
     parser = argparse.ArgumentParser(description="JT 3D Printing News (FINAL)")
     parser.add_argument("--test", action="store_true", help="Mode test")
     parser.add_argument("--config", default="config.json", help="Config file")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Ignore les réponses Ollama en cache")
     
     args = parser.parse_args()
     
     try:
         orchestrator = JT3DOrchestrator(args.config)
+        if args.no_llm_cache:
+            orchestrator.config.setdefault("ollama", {})["cache_bypass"] = True
         result = orchestrator.run(test_mode=args.test)
         
         if result:
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Ollama Client
+Appels /api/generate partagés par l'extracteur et l'analyseur lip-sync,
+avec les métriques renvoyées par Ollama (latence, tokens/s). Le mode streaming
+lit le flux NDJSON, parse l'objet JSON au fil des tokens et coupe la génération
+dès que l'objet est complet ou que le budget de tokens est atteint. Avec
+plusieurs hôtes, chaque requête passe par le pool (bascule si l'hôte tombe).
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+import requests
+
+from http_client import shared_session
+from llm_cache import LLMResponseCache
+from ollama_pool import OllamaHostPool
+
+logger = logging.getLogger(__name__)
+
+
+class JSONObjectScanner:
+    """Repère, au fil des morceaux de texte, la fin du premier objet JSON de premier niveau"""
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.complete = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Ajoute un morceau ; retourne le texte de l'objet dès qu'il est fermé"""
+        if self.complete is not None:
+            return self.complete
+        for char in chunk:
+            if not self.started:
+                if char != "{":
+                    continue  # Bavardage avant l'objet
+                self.started = True
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = "".join(self.buffer)
+                    return self.complete
+        return None
+
+
+class OllamaClient:
+    """Client HTTP Ollama (connexions keep-alive du client HTTP partagé)"""
+
+    def __init__(self, host: Union[str, List[str], OllamaHostPool] = "http://localhost:11434", timeout: float = 300,
+                 cache: LLMResponseCache = None, stall_timeout: float = 60,
+                 keep_alive: Union[str, int] = None):
+        """
+        Initialise le client
+
+        Args:
+            host: URL du serveur Ollama, liste d'URLs ou pool d'hôtes
+            timeout: Timeout d'une génération non-streamée (s)
+            cache: Cache des réponses par hash modèle + prompt + options (optionnel)
+            stall_timeout: En streaming, attente max entre deux tokens (s), chargement du modèle compris
+            keep_alive: Durée pendant laquelle Ollama garde le modèle chargé après chaque requête ("30m")
+        """
+        self.pool = host if isinstance(host, OllamaHostPool) else OllamaHostPool(host)
+        self.host = self.pool.hosts[0]
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.cache = cache
+        self.keep_alive = keep_alive
+        self.session = shared_session()
+        # Temps cumulés du run : chargement du modèle vs inférence
+        self.totals = {"requests": 0, "load_seconds": 0.0, "prompt_seconds": 0.0, "eval_seconds": 0.0}
+        self._totals_lock = threading.Lock()
+
+    def generate(self, model: str, prompt: str, options: Dict = None, use_cache: bool = True, **params) -> Dict:
+        """
+        Génération non-streamée
+
+        Args:
+            use_cache: False pour forcer une nouvelle génération (la réponse est quand même mise en cache)
+
+        Returns:
+            {"response": texte, "stats": {...}} ; lève requests.RequestException en cas d'échec
+        """
+        key = LLMResponseCache.key(model, prompt, options, **params) if self.cache else None
+        cached = self._from_cache(key, model, use_cache)
+        if cached is not None:
+            return cached
+
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        payload.update(params)
+
+        start = time.monotonic()
+
+        def call(host: str):
+            response = self.session.post(f"{host}/api/generate", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return host, response.json()
+
+        host, result = self._failover(call)
+        generated = {"response": result.get("response", ""),
+                     "stats": dict(self.stats(result, time.monotonic() - start), host=host)}
+        self._add_totals(generated["stats"])
+        if key:
+            self.cache.put(key, model, generated)
+        return generated
+
+    def generate_stream(self, model: str, prompt: str, options: Dict = None, stop_on_json: bool = True,
+                        token_budget: int = None, use_cache: bool = True, **params) -> Dict:
+        """
+        Génération streamée (NDJSON)
+
+        Args:
+            stop_on_json: Coupe la génération dès que le premier objet JSON est fermé
+            token_budget: Nombre max de tokens générés (aussi envoyé en num_predict)
+
+        Returns:
+            {"response": texte (l'objet JSON seul si stop_on_json), "stats": {... "ttft", "stopped"}}
+        """
+        options = dict(options or {})
+        if token_budget:
+            options.setdefault("num_predict", token_budget)
+        key = LLMResponseCache.key(model, prompt, options, stop_on_json=stop_on_json, **params) if self.cache else None
+        cached = self._from_cache(key, model, use_cache)
+        if cached is not None:
+            return cached
+
+        payload = {"model": model, "prompt": prompt, "stream": True, "options": options}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        payload.update(params)
+        # Hôte perdu en cours de flux : la génération repart de zéro sur un autre hôte
+        generated = self._failover(lambda host: self._stream(host, payload, stop_on_json, token_budget))
+        # Une réponse coupée (budget, num_predict, flux interrompu) ne doit pas être rejouée
+        if key and generated["stats"]["stopped"] in ("done", "json_complete"):
+            self.cache.put(key, model, generated)
+        return generated
+
+    def _stream(self, host: str, payload: Dict, stop_on_json: bool, token_budget: Optional[int]) -> Dict:
+        """Lit le flux NDJSON d'une génération sur un hôte"""
+        scanner = JSONObjectScanner() if stop_on_json else None
+        pieces = []
+        tokens = 0
+        first_token = None
+        final = {}
+        stopped = "done"
+
+        start = time.monotonic()
+        # Timeout de lecture = attente max entre deux lignes : il agit sur la progression, pas sur la durée totale
+        response = self.session.post(f"{host}/api/generate", json=payload, stream=True,
+                                     timeout=(10, self.stall_timeout))
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise requests.RequestException(f"Ollama: {chunk['error']}")
+                if chunk.get("done"):
+                    final = chunk
+                    break
+                text = chunk.get("response", "")
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.monotonic()
+                tokens += 1
+                pieces.append(text)
+                if scanner and scanner.feed(text) is not None:
+                    stopped = "json_complete"
+                    break
+                if token_budget and tokens >= token_budget:
+                    stopped = "token_budget"
+                    break
+        finally:
+            # Fermer la connexion interrompt la génération côté Ollama
+            response.close()
+
+        if stopped == "done" and (not final or final.get("done_reason") == "length" or
+                                  (scanner and scanner.complete is None)):
+            stopped = "truncated"  # Flux terminé avant la fin de la réponse ou de l'objet JSON
+
+        end = time.monotonic()
+        stats = self.stats(final, end - start) if final else self.stats({}, end - start)
+        decode_seconds = end - first_token if first_token else 0.0
+        stats.update({
+            "ttft": round(first_token - start, 3) if first_token else None,
+            "stopped": stopped,
+            "host": host,
+            "eval_tokens": final.get("eval_count", tokens),
+            "eval_seconds": stats["eval_seconds"] or round(decode_seconds, 3),
+            "tokens_per_s": stats["tokens_per_s"] or (round(tokens / decode_seconds, 1) if decode_seconds else 0.0)
+        })
+        self._add_totals(stats)
+        text = scanner.complete if scanner and scanner.complete is not None else "".join(pieces)
+        return {"response": text, "stats": stats}
+
+    def embed(self, model: str, texts: List[str], timeout: float = None) -> List[List[float]]:
+        """Embeddings d'une liste de textes (/api/embed, un seul appel ; timeout par défaut: self.timeout)"""
+        def call(host: str):
+            payload = {"model": model, "input": texts}
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
+            response = self.session.post(f"{host}/api/embed", json=payload, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response.json()["embeddings"]
+
+        return self._failover(call)
+
+    def _failover(self, call: Callable[[str], object]):
+        """Exécute `call(host)` sur l'hôte le moins chargé, puis sur les autres tant que l'hôte est en cause"""
+        tried = set()
+        while True:
+            host = self.pool.acquire(tried)
+            failure = False
+            try:
+                return call(host)
+            except requests.RequestException as e:
+                failure = OllamaHostPool.is_host_failure(e)
+                tried.add(host)
+                if not failure or len(tried) >= len(self.pool):
+                    raise
+                logger.warning(f"🔁 Ollama {host} en échec ({type(e).__name__}), bascule sur un autre hôte")
+            finally:
+                # Toujours libérer l'hôte (JSON invalide, clé absente...) ; échec compté seulement s'il est en cause
+                self.pool.release(host, ok=not failure)
+
+    def load_model(self, model: str, keep_alive: Union[str, int] = None) -> float:
+        """
+        Charge le modèle en mémoire sans rien générer (prompt vide) sur chaque hôte disponible
+
+        Returns:
+            Durée de chargement la plus longue (s) ; lève requests.RequestException si aucun hôte n'a chargé
+        """
+        payload = {"model": model, "keep_alive": keep_alive if keep_alive is not None else self.keep_alive}
+
+        def load(host: str) -> Optional[float]:
+            start = time.monotonic()
+            try:
+                response = self.session.post(f"{host}/api/generate", timeout=self.timeout, json=payload)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning(f"⚠️ Chargement {model} sur {host} impossible: {e}")
+                return None
+            return response.json().get("load_duration", 0) / 1e9 or time.monotonic() - start
+
+        hosts = self.pool.healthy() or self.pool.hosts
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            loaded = [seconds for seconds in executor.map(load, hosts) if seconds is not None]
+        if not loaded:
+            raise requests.ConnectionError(f"{model}: chargement impossible sur {', '.join(hosts)}")
+        with self._totals_lock:
+            self.totals["load_seconds"] += sum(loaded)
+        return max(loaded)
+
+    def unload_model(self, model: str):
+        """Décharge le modèle immédiatement (keep_alive 0) sur tous les hôtes"""
+        errors = []
+        for host in self.pool.hosts:
+            try:
+                response = self.session.post(f"{host}/api/generate", json={"model": model, "keep_alive": 0},
+                                             timeout=30)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                errors.append(e)
+        if len(errors) == len(self.pool.hosts):
+            raise errors[0]
+
+    def _add_totals(self, stats: Dict):
+        with self._totals_lock:
+            self.totals["requests"] += 1
+            self.totals["load_seconds"] += stats.get("load_seconds", 0.0)
+            self.totals["prompt_seconds"] += stats.get("prompt_seconds", 0.0)
+            self.totals["eval_seconds"] += stats.get("eval_seconds", 0.0)
+
+    def _from_cache(self, key: Optional[str], model: str, use_cache: bool) -> Optional[Dict]:
+        if not key or not use_cache:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"♻️ Réponse {model} en cache (inférence évitée: {cached['stats'].get('latency', 0):.1f}s)")
+            cached["stats"] = dict(cached["stats"], cached=True)
+        return cached
+
+    @staticmethod
+    def stats(result: Dict, latency: float) -> Dict:
+        """Métriques d'une génération (durées Ollama en nanosecondes)"""
+        eval_count = result.get("eval_count", 0)
+        eval_seconds = result.get("eval_duration", 0) / 1e9
+        return {
+            "latency": round(latency, 3),
+            "load_seconds": round(result.get("load_duration", 0) / 1e9, 3),
+            "prompt_tokens": result.get("prompt_eval_count", 0),
+            "prompt_seconds": round(result.get("prompt_eval_duration", 0) / 1e9, 3),
+            "eval_tokens": eval_count,
+            "eval_seconds": round(eval_seconds, 3),
+            "tokens_per_s": round(eval_count / eval_seconds, 1) if eval_seconds else 0.0
+        }
+
+
+class ModelLifecycle:
+    """Préchargement du modèle en parallèle du scraping, keep-alive pendant la pipeline, déchargement"""
+
+    def __init__(self, client: OllamaClient, model: str):
+        self.client = client
+        self.model = model
+        self._thread = None
+        self.load_seconds = None
+        self.error = None
+
+    def warm_up(self):
+        """Lance le chargement du modèle en arrière-plan"""
+        self._thread = threading.Thread(target=self._load, name="ollama-warm-up", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Attend la fin du préchargement ; True si le modèle est chargé"""
+        if self._thread:
+            self._thread.join(timeout)
+        return self.load_seconds is not None
+
+    def unload(self):
+        """Libère la RAM du modèle (avant le rendu Blender)"""
+        try:
+            self.client.unload_model(self.model)
+            logger.info(f"🧹 Modèle {self.model} déchargé")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Déchargement {self.model} impossible: {e}")
+
+    def _load(self):
+        try:
+            self.load_seconds = self.client.load_model(self.model)
+            logger.info(f"🔥 Modèle {self.model} préchargé en {self.load_seconds:.1f}s "
+                        f"(keep_alive {self.client.keep_alive})")
+        except requests.RequestException as e:
+            self.error = e
+            logger.warning(f"⚠️ Préchargement {self.model} impossible: {e}")
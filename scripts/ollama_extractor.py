@@ -8,67 +8,206 @@ import requests
 import json
 import logging
 import os
-from typing import Dict
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Dict, Iterator, List, Tuple
 from dotenv import load_dotenv
 
+from llm_schemas import ANIMATION_SCHEMA, COMBINED_SCHEMA, EXTRACTION_SCHEMA, SCHEMA_COUNTERS, parse_json_object, validate
+from ollama_client import OllamaClient
+from prompt_builder import PREFILL_TRACKER, PromptBuilder
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "phi3:3.8b"
+
+# Prefixes système fixes (paramètre "system" d'Ollama) : identiques d'un article à l'autre,
+# ils restent dans le cache KV du modèle chargé (keep_alive) et ne sont évalués qu'une fois
+EXTRACTION_SYSTEM = """You analyze 3D printing news and extract key information.
+
+For each article, provide:
+1. Brief summary (2-3 sentences)
+2. Key technical points (bullet list)
+3. Market impact assessment
+4. Relevance score (0-10)
+5. Keywords (5-7)
+
+Format JSON only."""
+
+# Mode combiné : mêmes champs + indices d'animation de la présentatrice, phrase par phrase du résumé
+COMBINED_SYSTEM = """You analyze 3D printing news and extract key information, then plan how a TV presenter
+reads the summary on camera.
+
+For each article, provide:
+1. Brief summary (2-3 sentences)
+2. Key technical points (bullet list)
+3. Market impact assessment
+4. Relevance score (0-10)
+5. Keywords (5-7)
+6. Animation cues: overall emotions, gestures, head movements (left/right/center), hand animations,
+   timing of key moments (in seconds), and one segment per summary sentence with its text, emotion,
+   gesture and head movement
+
+Format JSON only."""
+
+# Indices d'animation seuls, pour la news retenue quand elle a été extraite sans le mode combiné
+ANIMATION_SYSTEM = """You plan how a TV presenter reads a news summary on camera.
+
+Provide overall emotions, gestures, head movements (left/right/center), hand animations,
+timing of key moments (in seconds), and one segment per summary sentence with its text, emotion,
+gesture and head movement.
+
+Format JSON only."""
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+MAP_SYSTEM = """You summarize excerpts of 3D printing news articles in 3-4 factual sentences.
+Keep company names, products, figures and technical specifications."""
+
 class OllamaNewsExtractor:
     """Extrait infos d'une news avec Ollama Phi 3.8b"""
     
-    def __init__(self, host: str = "http://localhost:11434", model: str = "phi3:3.8b"):
-        """Initialise l'extracteur Ollama"""
+    def __init__(self, host: str = "http://localhost:11434", model: str = DEFAULT_MODEL,
+                 num_ctx: int = 4096, num_parallel: int = 1, client: OllamaClient = None,
+                 stream: bool = True, token_budget: int = 512, structured: bool = True,
+                 map_reduce: bool = True, chunk_tokens: int = 1024, map_token_budget: int = 160,
+                 animation: bool = False, animation_token_budget: int = 320, max_chunks: int = 6,
+                 slots: threading.Semaphore = None):
+        """
+        Initialise l'extracteur Ollama
+        
+        Args:
+            num_ctx: Contexte du modèle (tokens) : le contenu est placé dans ce budget, réponse comprise
+            num_parallel: Requêtes simultanées pour extract_many (= OLLAMA_NUM_PARALLEL du serveur)
+            client: Client Ollama partagé (optionnel)
+            stream: Génération streamée, arrêtée dès que l'objet JSON est complet
+            token_budget: Tokens générés max par extraction
+            structured: Sortie contrainte par EXTRACTION_SCHEMA (format Ollama), validée et réparée
+            map_reduce: Texte complet trop long résumé par morceaux (map, en parallèle) avant l'extraction
+            chunk_tokens: Taille des morceaux du map (tokens)
+            map_token_budget: Tokens générés max par résumé de morceau
+            animation: Mode combiné, ajoute les indices d'animation ("animation") dans la même génération
+            animation_token_budget: Tokens générés en plus pour les indices d'animation
+            max_chunks: Morceaux résumés max par article (le début de la page est gardé)
+            slots: Sémaphore des générations en cours, partagé entre extracteurs (défaut: num_parallel)
+        """
         self.host = host
         # Le modèle par défaut est maintenant 'phi3:3.8b'
-        self.model = model or os.getenv("OLLAMA_MODEL", "phi3:3.8b")
+        self.model = model or os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+        # Texte envoyé au modèle : texte complet de la page si disponible, sinon le résumé,
+        # dans la limite du contexte (num_ctx moins la réponse)
+        self.num_ctx = num_ctx
+        self.animation = animation
+        self.animation_token_budget = animation_token_budget
+        self.system = COMBINED_SYSTEM if animation else EXTRACTION_SYSTEM
+        self.schema = COMBINED_SCHEMA if animation else EXTRACTION_SCHEMA
+        if animation:
+            token_budget += animation_token_budget
+        self.builder = PromptBuilder(num_ctx, reserve_output=token_budget)
+        self.prefill = PREFILL_TRACKER
+        self.options = {"temperature": 0.7, "num_ctx": num_ctx}
+        self.map_reduce = map_reduce
+        self.chunk_tokens = min(chunk_tokens, num_ctx - map_token_budget - 200)
+        self.map_token_budget = map_token_budget
+        self.max_chunks = max(1, int(max_chunks))
+        self.num_parallel = max(1, int(num_parallel))
+        # Toutes les générations (extraction, map, réparation) passent par ces emplacements :
+        # les résumés map lancés depuis extract_many ne dépassent pas num_parallel
+        self.slots = slots or threading.BoundedSemaphore(self.num_parallel)
+        self.client = client or OllamaClient(host, timeout=300)
+        self.stream = stream
+        self.token_budget = token_budget
+        self.structured = structured
         self.api_url = f"{self.host}/api/generate"
         logger.info(f"🤖 Ollama Extractor initialized ({self.model})")
     
+    def extract_many(self, articles: List[Dict], k: int = 5, concurrency: int = None,
+                     deadline: float = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Extrait les k premiers articles en parallèle
+        
+        Args:
+            articles: Articles triés (seuls les k premiers sont analysés)
+            k: Nombre d'articles à extraire
+            concurrency: Requêtes simultanées (défaut: num_parallel)
+            deadline: Durée max de tout le batch (s), None = illimitée
+        
+        Yields:
+            (index de l'article, extraction avec "stats") dans l'ordre de fin
+        """
+        batch = articles[:k]
+        if not batch:
+            return
+        workers = min(concurrency or self.num_parallel, len(batch))
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+        futures = {executor.submit(self.extract, article): i for i, article in enumerate(batch)}
+        done = 0
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                extracted = future.result()
+                done += 1
+                stats = extracted.get("stats", {})
+                logger.info(f"   ⚡ [{done}/{len(batch)}] {batch[futures[future]]['title'][:40]}... "
+                            f"{stats.get('latency', 0):.1f}s, {stats.get('tokens_per_s', 0):.1f} tokens/s")
+                yield futures[future], extracted
+        except FuturesTimeout:
+            logger.warning(f"⏱️ Extraction batch: {len(batch) - done} articles hors deadline ({deadline:.0f}s)")
+        finally:
+            # Les requêtes déjà envoyées à Ollama ne sont pas attendues
+            executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"📊 {done}/{len(batch)} extractions en {time.monotonic() - start:.1f}s ({workers} en parallèle)")
+    
     def extract(self, article: Dict) -> Dict:
         """Extrait les infos principales d'un article"""
         
         logger.info(f"📊 Analyzing: {article['title'][:50]}...")
         
-        # Prompt pour extraction
-        prompt = f"""Analyze this 3D printing news and extract key information.
-
-Title: {article['title']}
-Content: {article['content'][:500]}
-
-Please provide:
-1. Brief summary (2-3 sentences)
-2. Key technical points (bullet list)
-3. Market impact assessment
-4. Relevance score (0-10)
-5. Keywords (5-7)
-
-Format JSON only."""
+        # Couverture récente du même sujet (archive), pour situer la news
+        context = ""
+        if article.get("related"):
+            lines = [f"- {r['published']} {r['source']}: {r['title']}" for r in article["related"]]
+            context = "\nEarlier related coverage:\n" + "\n".join(lines) + "\n"
         
         try:
-            # Timeout augmenté à 300 secondes (5 minutes) pour le disque dur
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7
-                },
-                timeout=300 
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"❌ Ollama error: {response.status_code}")
-                return self._default_extraction(article)
-            
-            result = response.json()
-            extracted_text = result.get("response", "")
+            # Contenu placé dans le budget de tokens restant après le prompt
+            text = article.get("full_text") or article["content"]
+            budget = self.builder.available(self.system + self._prompt(article, "", context))
+            prompt_stats = {"content_tokens": self.builder.counter.count(text), "budget_tokens": budget}
+            if prompt_stats["content_tokens"] <= budget:
+                content = text
+            elif self.map_reduce and article.get("full_text"):
+                content = self._condense(text, budget, prompt_stats)
+            else:
+                content = self.builder.fit(text, budget)
+            prompt = self._prompt(article, content, context)
+            prompt_stats["prefix_tokens"] = self.builder.counter.count(self.system)
+            prompt_stats["prompt_tokens_estimated"] = prompt_stats["prefix_tokens"] + self.builder.counter.count(prompt)
             
-            # Parse la réponse
-            extracted_info = self._parse_response(extracted_text)
+            # Timeout augmenté à 300 secondes (5 minutes) pour le disque dur
+            if self.structured:
+                result = self._generate(prompt, system=self.system, format=self.schema)
+                extracted_info = self._validated(result)
+            else:
+                result = self._generate(prompt, system=self.system)
+                extracted_info = self._parse_response(result["response"])
+            stats = result["stats"]
+            stats.update(prompt_stats)
+            if not stats.get("cached"):
+                stats.update(self._record_prefill(stats))
+                # Prefix en cache : prompt_eval_count ne compte que la partie article
+                if stats["prefix_cache"] == "cold":
+                    self.builder.counter.calibrate(self.system + prompt, stats.get("prompt_tokens", 0))
+            logger.info(f"   🧮 Prompt {stats['prompt_tokens_estimated']} tokens / num_ctx {self.num_ctx} "
+                        f"(prefix {prompt_stats['prefix_tokens']}, contenu {prompt_stats['content_tokens']}, "
+                        f"budget {budget}, map {prompt_stats.get('map_calls', 0)}), "
+                        f"prefill {stats.get('prefill_seconds', 0):.2f}s "
+                        f"(économisé {stats.get('prefill_seconds_saved', 0):.2f}s)")
             
-            return {
+            extracted = {
                 "title": article["title"],
                 "source": article["source"],
                 "summary": extracted_info.get("summary", ""),
@@ -76,17 +215,161 @@ Format JSON only."""
                 "market_impact": extracted_info.get("market_impact", ""),
                 "relevance_score": extracted_info.get("relevance_score", 5),
                 "keywords": extracted_info.get("keywords", []),
+                "related": article.get("related", []),
                 "angles": {
                     "technical": self._generate_angle(article, "technical"),
                     "market": self._generate_angle(article, "market"),
                     "business": self._generate_angle(article, "business")
-                }
+                },
+                "stats": result["stats"]
             }
+            if self.animation:
+                extracted["animation"] = self._animation_cues(extracted_info)
+            return extracted
             
+        except requests.HTTPError as e:
+            logger.error(f"❌ Ollama error: {e.response.status_code}")
+            return self._default_extraction(article)
         except Exception as e:
             logger.error(f"❌ Erreur Ollama: {e}")
             return self._default_extraction(article)
     
+    def animate(self, extracted: Dict) -> Dict:
+        """Indices d'animation du résumé d'une extraction (une génération courte, neutres en cas d'échec)"""
+        summary = extracted.get("summary", "")
+        try:
+            with self.slots:
+                result = self.client.generate_stream(self.model, f"Summary: {summary}", options=self.options,
+                                                     token_budget=self.animation_token_budget,
+                                                     system=ANIMATION_SYSTEM, format=ANIMATION_SCHEMA)
+            return self._animation_cues({"summary": summary, "animation": parse_json_object(result["response"])})
+        except Exception as e:
+            logger.warning(f"⚠️ Indices d'animation indisponibles: {e}")
+            return neutral_animation(summary)
+    
+    @staticmethod
+    def _prompt(article: Dict, content: str, context: str) -> str:
+        """Partie propre à l'article du prompt d'extraction (après le prefix système)"""
+        return f"""Title: {article['title']}
+Content: {content}
+{context}"""
+    
+    def _record_prefill(self, stats: Dict) -> Dict:
+        """Prefill de l'appel (prompt_eval_duration, ou TTFT hors chargement si le flux a été coupé)"""
+        prefill = stats.get("prompt_seconds") or max(0.0, (stats.get("ttft") or 0.0) - stats.get("load_seconds", 0.0))
+        return self.prefill.record(stats.get("host", self.host), self.system, stats["prompt_tokens_estimated"], prefill,
+                                   prefix_tokens=stats.get("prefix_tokens", 0),
+                                   evaluated_tokens=stats.get("prompt_tokens", 0))
+    
+    def _condense(self, text: str, budget: int, prompt_stats: Dict) -> str:
+        """Map-reduce : résume chaque morceau en parallèle, puis assemble les résumés dans le budget"""
+        chunks = self.builder.chunks(text, self.chunk_tokens)
+        if len(chunks) > self.max_chunks:
+            logger.info(f"   ✂️ Map-reduce: {len(chunks)} morceaux, seuls les {self.max_chunks} premiers sont résumés")
+            prompt_stats["map_chunks_dropped"] = len(chunks) - self.max_chunks
+            chunks = chunks[:self.max_chunks]
+        start = time.monotonic()
+        
+        def summarize(chunk: str) -> Dict:
+            with self.slots:
+                return self.client.generate_stream(self.model, f"Excerpt:\n{chunk}", options=self.options,
+                                                   stop_on_json=False, token_budget=self.map_token_budget,
+                                                   system=MAP_SYSTEM)
+        
+        summaries = [""] * len(chunks)
+        prompt_tokens = 0
+        with ThreadPoolExecutor(max_workers=min(self.num_parallel, len(chunks)),
+                                thread_name_prefix="map") as executor:
+            futures = {executor.submit(summarize, chunk): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Morceau perdu : on garde son début plutôt que rien
+                    logger.warning(f"   ⚠️ Résumé du morceau {futures[future] + 1}/{len(chunks)} impossible: {e}")
+                    summaries[futures[future]] = self.builder.fit(chunks[futures[future]], self.map_token_budget)
+                    continue
+                summaries[futures[future]] = result["response"].strip()
+                prompt_tokens += result["stats"].get("prompt_tokens", 0)
+        
+        prompt_stats.update({"map_calls": len(chunks), "map_prompt_tokens": prompt_tokens,
+                             "map_seconds": round(time.monotonic() - start, 3)})
+        logger.info(f"   🗜️ Map-reduce: {len(chunks)} morceaux résumés en {prompt_stats['map_seconds']:.1f}s "
+                    f"({prompt_stats['content_tokens']} -> {self.builder.counter.count(' '.join(summaries))} tokens)")
+        return self.builder.fit("\n\n".join(summaries), budget)
+    
+    def _validated(self, result: Dict) -> Dict:
+        """Valide la sortie contre le schéma ; un seul essai de réparation ciblé si invalide"""
+        info, errors = self._check(result["response"])
+        if not errors:
+            self._count(result, "valid")
+            result["stats"]["schema"] = "valid"
+            return info
+        
+        # Prompt de réparation court : la sortie fautive et ses erreurs, sans l'article
+        logger.warning(f"   ⚠️ Sortie {self.model} invalide ({'; '.join(errors[:3])}), réparation...")
+        repair_prompt = f"""This JSON does not match the required schema.
+Problems: {'; '.join(errors[:5])}
+
+JSON:
+{result['response'][:1500]}
+
+Return only the corrected JSON object with keys {', '.join(self.schema['required'])} (relevance_score: integer 0-10)."""
+        try:
+            repaired = self._generate(repair_prompt, format=self.schema)
+            info, errors = self._check(repaired["response"])
+        except Exception as e:
+            errors = [str(e)]
+        
+        if not errors:
+            self._count(result, "repaired")
+            result["stats"]["schema"] = "repaired"
+            return info
+        self._count(result, "failed")
+        result["stats"]["schema"] = "failed"
+        return self._parse_response(result["response"])
+    
+    def _count(self, result: Dict, outcome: str):
+        """Compteur de sorties du modèle, sauf pour une réponse rejouée depuis le cache (déjà comptée)"""
+        if not result["stats"].get("cached"):
+            SCHEMA_COUNTERS.record(self.model, outcome)
+    
+    def _check(self, text: str):
+        """(infos normalisées, erreurs) d'une sortie d'extraction"""
+        parsed = parse_json_object(text)
+        if parsed is None:
+            return None, ["aucun objet JSON"]
+        return validate(parsed, self.schema)
+    
+    @staticmethod
+    def _animation_cues(info: Dict) -> Dict:
+        """Indices d'animation du mode combiné, un segment par phrase du résumé (neutres si absents)"""
+        cues = neutral_animation(info.get("summary", ""))
+        animation = info.get("animation")
+        if not isinstance(animation, dict):
+            return cues
+        cues.update({key: value for key, value in animation.items() if key in cues and key != "segments" and value})
+        # Segments réalignés sur les phrases du résumé, qui devient le texte du script
+        segments = [s for s in animation.get("segments") or [] if isinstance(s, dict)]
+        for i, segment in enumerate(cues["segments"]):
+            if i < len(segments):
+                segment.update({key: segments[i][key] for key in ("emotion", "gesture", "head_movement")
+                                if segments[i].get(key)})
+        return cues
+    
+    def _generate(self, prompt: str, **params) -> Dict:
+        """Génère via le client (streamé par défaut)"""
+        with self.slots:
+            if not self.stream:
+                return self.client.generate(self.model, prompt, options=self.options, **params)
+            result = self.client.generate_stream(self.model, prompt, options=self.options,
+                                                 token_budget=self.token_budget, **params)
+        stats = result["stats"]
+        if not stats.get("cached"):
+            logger.info(f"   ⏱️ TTFT {stats['ttft'] or 0:.1f}s, {stats['eval_tokens']} tokens "
+                        f"à {stats['tokens_per_s']:.1f}/s (arrêt: {stats['stopped']})")
+        return result
+    
     def _parse_response(self, response_text: str) -> Dict:
         """Parse la réponse Ollama"""
         try:
@@ -120,7 +403,7 @@ Format JSON only."""
     
     def _default_extraction(self, article: Dict) -> Dict:
         """Extraction par défaut si Ollama échoue"""
-        return {
+        extracted = {
             "title": article["title"],
             "source": article["source"],
             "summary": article["content"][:200],
@@ -132,17 +415,25 @@ Format JSON only."""
                 "technical": "Avancée technologique en impression 3D",
                 "market": "Impact sur le marché mondial",
                 "business": "Opportunités commerciales"
-            }
+            },
+            "stats": {"error": True}
         }
+        if self.animation:
+            extracted["animation"] = neutral_animation(extracted["summary"])
+        return extracted
 
 
 class OllamaLipSyncAnalyzer:
     """Analyse le texte pour générer lip-sync et gestes"""
     
-    def __init__(self, host: str = "http://localhost:11434", model: str = "phi3:3.8b"):
+    def __init__(self, host: str = "http://localhost:11434", model: str = DEFAULT_MODEL,
+                 client: OllamaClient = None, stream: bool = True, token_budget: int = 384):
         """Initialise l'analyseur lip-sync"""
         self.host = host
-        self.model = model or os.getenv("OLLAMA_MODEL", "phi3:3.8b")
+        self.model = model or os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+        self.client = client or OllamaClient(host, timeout=300)
+        self.stream = stream
+        self.token_budget = token_budget
         self.api_url = f"{self.host}/api/generate"
     
     def analyze_for_animation(self, script_text: str) -> Dict:
@@ -162,32 +453,18 @@ Provide:
 Format as JSON."""
         
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7
-                },
-                timeout=300 
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return self._parse_animation_response(result.get("response", ""))
+            if self.stream:
+                result = self.client.generate_stream(self.model, prompt, options={"temperature": 0.7},
+                                                     token_budget=self.token_budget)
+            else:
+                result = self.client.generate(self.model, prompt, options={"temperature": 0.7})
+            return self._parse_animation_response(result["response"])
             
         except Exception as e:
             logger.warning(f"⚠️ Ollama animation analysis failed: {e}")
         
         # Fallback
-        return {
-            "emotions": ["neutral"],
-            "gestures": [],
-            "head_movements": "center",
-            "hand_animations": [],
-            "timing": {}
-        }
+        return neutral_animation(script_text)
     
     def _parse_animation_response(self, response_text: str) -> Dict:
         """Parse la réponse animation Ollama"""
@@ -199,13 +476,20 @@ Format as JSON."""
         except:
             pass
         
-        return {
-            "emotions": ["neutral"],
-            "gestures": [],
-            "head_movements": "center",
-            "hand_animations": [],
-            "timing": {}
-        }
+        return neutral_animation("")
+
+
+def neutral_animation(text: str) -> Dict:
+    """Animation neutre, un segment par phrase du texte"""
+    return {
+        "emotions": ["neutral"],
+        "gestures": [],
+        "head_movements": "center",
+        "hand_animations": [],
+        "timing": {},
+        "segments": [{"text": sentence, "emotion": "neutral", "gesture": "none", "head_movement": "center"}
+                     for sentence in SENTENCE_RE.split(text.strip()) if sentence]
+    }
 
 
 def main():
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Ollama Host Pool
+Répartit les requêtes entre plusieurs serveurs Ollama (moins de requêtes en
+cours d'abord), vérifie leur santé, écarte les hôtes en échec et bascule une
+requête sur un autre hôte quand le sien tombe.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Set, Union
+
+import requests
+
+from http_client import shared_session
+
+logger = logging.getLogger(__name__)
+
+
+class NoHealthyHost(requests.ConnectionError):
+    """Aucun hôte Ollama disponible"""
+
+
+class OllamaHostPool:
+    """Pool d'hôtes Ollama, sélection par requêtes en cours (least outstanding requests)"""
+
+    def __init__(self, hosts: Union[str, List[str]], max_failures: int = 2, eject_seconds: float = 60,
+                 health_interval: float = 30, health_timeout: float = 3):
+        """
+        Initialise le pool
+
+        Args:
+            hosts: URL ou liste d'URLs des serveurs Ollama
+            max_failures: Échecs consécutifs avant d'écarter un hôte
+            eject_seconds: Durée d'éviction avant un nouveau health check
+            health_interval: Période du health check en arrière-plan (s), 0 = désactivé
+            health_timeout: Timeout du health check (s)
+        """
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts = [host.rstrip("/") for host in hosts]
+        if not self.hosts:
+            raise ValueError("OllamaHostPool: aucun hôte")
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.health_timeout = health_timeout
+        self.session = shared_session()
+        self.state = {host: {"outstanding": 0, "failures": 0, "ejected_until": 0.0,
+                             "requests": 0, "errors": 0} for host in self.hosts}
+        self._lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+        self._health_thread = None
+        if health_interval and len(self.hosts) > 1:
+            self._health_thread = threading.Thread(target=self._health_loop, args=(health_interval,),
+                                                   name="ollama-health", daemon=True)
+            self._health_thread.start()
+
+    def acquire(self, exclude: Set[str] = None) -> str:
+        """Hôte disponible avec le moins de requêtes en cours (hors `exclude`) ; lève NoHealthyHost"""
+        exclude = exclude or set()
+        now = time.monotonic()
+        with self._lock:
+            candidates = [h for h in self.hosts if h not in exclude and self.state[h]["ejected_until"] <= now]
+            if not candidates:
+                # Tout est écarté : on retente quand même l'hôte qui revient le plus tôt
+                candidates = sorted((h for h in self.hosts if h not in exclude),
+                                    key=lambda h: self.state[h]["ejected_until"])[:1]
+            if not candidates:
+                raise NoHealthyHost("Aucun hôte Ollama disponible")
+            # Rotation du point de départ pour départager les égalités
+            self._next = (self._next + 1) % len(self.hosts)
+            ordered = self.hosts[self._next:] + self.hosts[:self._next]
+            host = min((h for h in ordered if h in candidates), key=lambda h: self.state[h]["outstanding"])
+            self.state[host]["outstanding"] += 1
+            self.state[host]["requests"] += 1
+            return host
+
+    def release(self, host: str, ok: bool = True):
+        """Fin d'une requête ; `ok=False` compte un échec (éviction après max_failures)"""
+        with self._lock:
+            state = self.state[host]
+            state["outstanding"] -= 1
+            if ok:
+                state["failures"] = 0
+                return
+            state["errors"] += 1
+            state["failures"] += 1
+            if state["failures"] >= self.max_failures:
+                state["ejected_until"] = time.monotonic() + self.eject_seconds
+                logger.warning(f"🚫 Ollama {host} écarté {self.eject_seconds:.0f}s "
+                               f"({state['failures']} échecs consécutifs)")
+
+    @staticmethod
+    def is_host_failure(error: Exception) -> bool:
+        """Erreur imputable à l'hôte (injoignable, timeout, 5xx) plutôt qu'à la requête"""
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code >= 500
+        return False
+
+    def healthy(self) -> List[str]:
+        """Hôtes non écartés"""
+        now = time.monotonic()
+        with self._lock:
+            return [h for h in self.hosts if self.state[h]["ejected_until"] <= now]
+
+    def check(self, host: str) -> bool:
+        """Health check (/api/tags) ; remet l'hôte en service ou l'écarte"""
+        try:
+            self.session.get(f"{host}/api/tags", timeout=self.health_timeout).raise_for_status()
+            ok = True
+        except requests.RequestException:
+            ok = False
+        with self._lock:
+            state = self.state[host]
+            if ok:
+                if state["ejected_until"]:
+                    logger.info(f"✅ Ollama {host} de nouveau disponible")
+                state["failures"] = 0
+                state["ejected_until"] = 0.0
+            else:
+                state["failures"] = max(state["failures"], self.max_failures)
+                state["ejected_until"] = time.monotonic() + self.eject_seconds
+        return ok
+
+    def check_all(self) -> Dict[str, bool]:
+        return {host: self.check(host) for host in self.hosts}
+
+    def stats(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return {host: dict(state, healthy=state["ejected_until"] <= now) for host, state in self.state.items()}
+
+    def close(self):
+        self._stop.set()
+
+    def _health_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            for host in self.hosts:
+                # Les hôtes en service sont vérifiés par le trafic ; on ne sonde que les écartés
+                if self.state[host]["ejected_until"]:
+                    self.check(host)
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def __repr__(self) -> str:
+        return f"OllamaHostPool({', '.join(self.hosts)})"
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Adaptive Poll Scheduler
+Apprend l'intervalle de mise à jour de chaque flux à partir des dates de ses
+entrées (moyenne mobile exponentielle) et ne le récupère que lorsqu'il est dû,
+avec jitter (vers le bas) et backoff exponentiel en cas d'échec. État persisté en JSON.
+"""
+
+import json
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from json_sources import iso_to_epoch
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Date d'entrée RSS (RFC 822) ou ISO 8601 en timestamp"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        pass
+    return iso_to_epoch(value) or None
+
+
+class PollScheduler:
+    """Planning de polling par flux : intervalle appris, prochain poll, échecs"""
+
+    def __init__(
+        self,
+        state_file: str = "data/poll_schedule.json",
+        min_interval: float = 600,
+        max_interval: float = 22 * 3600,
+        default_interval: float = 3600,
+        alpha: float = 0.3,
+        jitter: float = 0.1,
+        idle_growth: float = 1.5,
+        max_backoff: float = 6 * 3600
+    ):
+        """
+        Initialise le planning
+
+        Args:
+            state_file: Fichier JSON de l'état entre deux runs
+            min_interval: Intervalle de polling min (s)
+            max_interval: Intervalle de polling max (s), sous la période des runs (CI quotidienne)
+            default_interval: Intervalle d'un flux jamais vu (s)
+            alpha: Poids d'une nouvelle observation dans la moyenne mobile
+            jitter: Avance aléatoire relative du prochain poll (jamais de retard)
+            idle_growth: Facteur appliqué à l'intervalle quand le flux n'a rien de nouveau
+            max_backoff: Attente max après des échecs consécutifs (s)
+        """
+        self.state_file = state_file
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.alpha = alpha
+        self.jitter = jitter
+        self.idle_growth = idle_growth
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.state = {}
+
+        try:
+            with open(state_file, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def is_due(self, url: str, now: float = None) -> bool:
+        """True si le flux doit être récupéré maintenant"""
+        now = now or time.time()
+        feed = self.state.get(url, {})
+        # Planning enregistré avec un plafond plus haut (ancienne config) : ramené au plafond actuel
+        next_poll = min(feed.get("next_poll", 0), feed.get("last_poll", 0) + self.max_interval)
+        return next_poll <= now
+
+    def due(self, urls: List[str], now: float = None) -> List[str]:
+        """Flux à récupérer maintenant"""
+        now = now or time.time()
+        return [url for url in urls if self.is_due(url, now)]
+
+    def record_success(self, url: str, entries: List[Dict], now: float = None):
+        """Met à jour l'intervalle appris après un poll réussi"""
+        now = now or time.time()
+        with self._lock:
+            feed = self.state.setdefault(url, {"interval": self.default_interval, "last_entry": 0})
+            feed["failures"] = 0
+            timestamps = sorted({ts for ts in (parse_timestamp(e.get("published", "")) for e in entries)
+                                 if ts and ts <= now + 3600}, reverse=True)
+            newest = timestamps[0] if timestamps else 0
+
+            if newest > feed.get("last_entry", 0):
+                # Écart médian entre entrées récentes = rythme de publication observé
+                gaps = [a - b for a, b in zip(timestamps[:10], timestamps[1:11])]
+                if gaps:
+                    observed = statistics.median(gaps)
+                    if feed.get("last_entry", 0):
+                        feed["interval"] = self.alpha * observed + (1 - self.alpha) * feed["interval"]
+                    else:
+                        feed["interval"] = observed  # Premier poll : pas d'historique à lisser
+                feed["last_entry"] = newest
+            else:
+                # Rien de nouveau : on espace les polls
+                feed["interval"] = feed["interval"] * self.idle_growth
+
+            feed["interval"] = min(self.max_interval, max(self.min_interval, feed["interval"]))
+            feed["last_poll"] = now
+            feed["next_poll"] = now + self._jittered(feed["interval"])
+
+    def record_failure(self, url: str, now: float = None):
+        """Backoff exponentiel après un échec"""
+        now = now or time.time()
+        with self._lock:
+            feed = self.state.setdefault(url, {"interval": self.default_interval, "last_entry": 0})
+            feed["failures"] = feed.get("failures", 0) + 1
+            backoff = min(self.max_backoff, self.min_interval * 2 ** (feed["failures"] - 1))
+            feed["last_poll"] = now
+            feed["next_poll"] = now + self._jittered(backoff)
+
+    def save(self):
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        with self._lock:
+            with open(self.state_file, "w") as f:
+                json.dump(self.state, f, indent=2)
+
+    def _jittered(self, seconds: float) -> float:
+        # Jitter vers le bas seulement : un flux au plafond reste dû au run quotidien suivant
+        return seconds * random.uniform(1 - self.jitter, 1)
+
+
+def main():
+    """Fonction de test"""
+    logging.basicConfig(level=logging.INFO)
+    scheduler = PollScheduler(state_file="/tmp/poll_schedule_test.json")
+    now = time.time()
+    busy = [{"published": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime(now - i * 300))} for i in range(10)]
+    quiet = [{"published": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime(now - i * 5 * 86400))} for i in range(5)]
+    scheduler.record_success("reddit", busy, now)
+    scheduler.record_success("prusa", quiet, now)
+    for url, feed in scheduler.state.items():
+        print(f"{url:8} intervalle {feed['interval'] / 60:7.1f} min, prochain poll dans {(feed['next_poll'] - now) / 60:7.1f} min")
+
+
+if __name__ == "__main__":
+    main()
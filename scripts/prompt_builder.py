@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Prompt Builder
+Compte les tokens d'un prompt contre le contexte du modèle (num_ctx) et y
+place le plus de contenu possible ; découpe les articles trop longs en
+morceaux pour un résumé map-reduce. Mesure le prefill économisé quand le
+prefix système est déjà dans le cache KV d'Ollama.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class TokenCounter:
+    """Estimation du nombre de tokens (caractères par token, recalibré sur les comptes d'Ollama)"""
+
+    def __init__(self, chars_per_token: float = 3.5, alpha: float = 0.2):
+        self.chars_per_token = chars_per_token
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+
+    def calibrate(self, text: str, prompt_tokens: int):
+        """Ajuste le ratio avec le prompt_eval_count réel d'une génération"""
+        if prompt_tokens < 50:
+            return  # Trop court (ou prefix en cache) pour être représentatif
+        observed = len(text) / prompt_tokens
+        with self._lock:
+            self.chars_per_token = (1 - self.alpha) * self.chars_per_token + self.alpha * observed
+
+
+class PromptBuilder:
+    """Place le contenu d'un article dans le budget de tokens du contexte"""
+
+    def __init__(self, num_ctx: int = 4096, reserve_output: int = 512, counter: TokenCounter = None):
+        """
+        Args:
+            num_ctx: Contexte du modèle (tokens), aussi envoyé dans les options Ollama
+            reserve_output: Tokens laissés à la réponse
+            counter: Compteur de tokens partagé (optionnel)
+        """
+        self.num_ctx = num_ctx
+        self.reserve_output = reserve_output
+        self.counter = counter or TokenCounter()
+
+    def available(self, template: str) -> int:
+        """Tokens disponibles pour le contenu dans un prompt (template sans le contenu)"""
+        return max(0, self.num_ctx - self.reserve_output - self.counter.count(template))
+
+    def fit(self, text: str, budget: int) -> str:
+        """Tronque le texte au budget, à une fin de phrase quand c'est possible"""
+        if self.counter.count(text) <= budget:
+            return text
+        limit = int(budget * self.counter.chars_per_token)
+        cut = text[:limit]
+        boundary = max(cut.rfind(". "), cut.rfind("\n"))
+        return cut[:boundary + 1] if boundary > limit // 2 else cut
+
+    def chunks(self, text: str, chunk_tokens: int) -> List[str]:
+        """Découpe un texte en morceaux d'au plus chunk_tokens, sur paragraphes puis phrases"""
+        units = []
+        for paragraph in PARAGRAPH_RE.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if self.counter.count(paragraph) <= chunk_tokens:
+                units.append(paragraph)
+            else:
+                units.extend(self.fit(sentence, chunk_tokens) for sentence in SENTENCE_RE.split(paragraph))
+
+        chunks, current = [], []
+        for unit in units:
+            if current and self.counter.count("\n\n".join(current + [unit])) > chunk_tokens:
+                chunks.append("\n\n".join(current))
+                current = []
+            current.append(unit)
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+
+class PrefillTracker:
+    """Prefill par (hôte, prefix système) : état du cache déduit du prompt_eval_count, gain mesuré contre le froid"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rates = {}  # (hôte, hash du prefix) -> secondes de prefill par token, mesurées à froid
+        self.calls = 0
+        self.saved_seconds = 0.0
+
+    def record(self, host: str, system: str, prompt_tokens: int, prefill_seconds: float,
+               prefix_tokens: int = 0, evaluated_tokens: int = 0) -> Dict:
+        """
+        Enregistre le prefill d'un appel
+
+        Args:
+            host: Hôte Ollama qui a servi l'appel (chaque hôte a son propre cache KV)
+            system: Prefix système envoyé
+            prompt_tokens: Tokens estimés du prompt complet (prefix + article)
+            prefill_seconds: Durée du prefill mesurée (prompt_eval_duration, ou TTFT hors chargement)
+            prefix_tokens: Tokens estimés du prefix
+            evaluated_tokens: prompt_eval_count rapporté par Ollama (0 si le flux a été coupé avant)
+
+        Returns:
+            Stats "prefix_cache" (cold/warm), "prefill_seconds", "prefill_baseline_seconds", "prefill_seconds_saved"
+        """
+        key = (host, hashlib.sha1(system.encode("utf-8")).hexdigest())
+        rate = prefill_seconds / max(1, prompt_tokens)
+        with self._lock:
+            cold_rate = self.rates.get(key)
+            if evaluated_tokens:
+                # Prefix en cache : Ollama n'évalue (et ne compte) que la partie après le prefix
+                warm = evaluated_tokens < prompt_tokens - prefix_tokens / 2
+            else:
+                # Pas de compte (génération coupée) : prefill nettement plus rapide qu'à froid sur cet hôte
+                warm = cold_rate is not None and rate < cold_rate / 2
+            if not warm:
+                self.rates[key] = rate
+            baseline = cold_rate * prompt_tokens if warm and cold_rate is not None else prefill_seconds
+            saved = max(0.0, baseline - prefill_seconds)
+            self.calls += 1
+            self.saved_seconds += saved
+        return {"prefix_cache": "warm" if warm else "cold", "prefill_seconds": round(prefill_seconds, 3),
+                "prefill_baseline_seconds": round(baseline, 3), "prefill_seconds_saved": round(saved, 3)}
+
+    def reset(self):
+        """Le modèle a été déchargé : les prefixes ne sont plus en cache"""
+        with self._lock:
+            self.rates.clear()
+
+
+# Suivi partagé par tous les extracteurs du process
+PREFILL_TRACKER = PrefillTracker()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Scoring Engine
+Score des articles par mots-clés et sources de prestige, avec des matchers
+construits une seule fois par run et un seul passage par champ et par article
+"""
+
+import logging
+from typing import Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCORING = {
+    "keywords": ["3d print", "prototype", "additive", "print", "impression"],
+    "prestige_sources": ["Prusa", "Formlabs", "Stratasys", "3D Systems", "All3DP"],
+    "field_weights": {"title": 10, "content": 5},
+    "source_weight": 20,
+    "cluster_bonus": 5,
+    "cluster_cap": 4,
+    "recency_bonus": 5,
+    "threshold": 5
+}
+
+
+class PatternMatcher:
+    """Trouve quels motifs apparaissent dans un texte (sous-chaînes, insensible à la casse)"""
+
+    def __init__(self, patterns: List[str]):
+        # Motifs en minuscules et dédupliqués, préparés une fois pour tout le run
+        self.patterns = tuple(sorted({p.lower() for p in patterns if p}))
+
+    def find(self, text: str) -> Set[str]:
+        """Motifs présents dans `text`"""
+        text = text.lower()
+        return {pattern for pattern in self.patterns if pattern in text}
+
+    def count(self, text: str) -> int:
+        """Nombre de motifs distincts présents dans `text`"""
+        text = text.lower()
+        return len([pattern for pattern in self.patterns if pattern in text])
+
+
+class ArticleScorer:
+    """Moteur de scoring construit une fois par run"""
+
+    def __init__(self, config: Dict = None):
+        """
+        Initialise le scorer
+
+        Args:
+            config: Section "scoring" de la config scraper (voir DEFAULT_SCORING)
+        """
+        self.config = dict(DEFAULT_SCORING)
+        self.config.update(config or {})
+        self.field_weights = dict(DEFAULT_SCORING["field_weights"])
+        self.field_weights.update(self.config["field_weights"])
+        self.threshold = self.config["threshold"]
+
+        self.keyword_matcher = PatternMatcher(self.config["keywords"])
+        self.source_matcher = PatternMatcher(self.config["prestige_sources"])
+        # TrendEngine optionnel : bonus pour les sujets en tendance
+        self.trends = None
+
+    def score(self, article: Dict) -> int:
+        """Score d'un article"""
+        return self.score_many([article])[0]
+
+    def score_many(self, articles: List[Dict]) -> List[int]:
+        """Score tout un batch d'articles en un passage (et remplit article["score"])"""
+        field_weights = list(self.field_weights.items())
+        count_keywords = self.keyword_matcher.count
+        count_sources = self.source_matcher.count
+        source_weight = self.config["source_weight"]
+        cluster_bonus = self.config["cluster_bonus"]
+        cluster_cap = self.config["cluster_cap"]
+        recency_bonus = self.config["recency_bonus"]
+        trend_boost = self.trends.boost if self.trends and self.trends.bursts else None
+
+        scores = []
+        for article in articles:
+            # Récence (bonus) : les articles hors fenêtre sont déjà filtrés
+            score = recency_bonus
+
+            # Keywords, chaque champ n'est mis en minuscules qu'une fois
+            for field, weight in field_weights:
+                score += weight * count_keywords(article.get(field, ""))
+
+            # Source prestige
+            score += source_weight * count_sources(article.get("source", ""))
+
+            # Reprise par plusieurs sources (bonus plafonné)
+            score += cluster_bonus * min(article.get("cluster_size", 1) - 1, cluster_cap)
+
+            # Sujet en tendance (burst contre la moyenne mobile)
+            if trend_boost:
+                article["trend_boost"] = trend_boost(article)
+                score += article["trend_boost"]
+
+            article["score"] = score
+            scores.append(score)
+
+        return scores
@@ -4,15 +4,28 @@ JT 3D PRINTING NEWS - Complete Scraper
 Scrape 40+ sources : RSS, LinkedIn, Instagram, Twitter, Reddit, YouTube, Google News
 """
 
-import feedparser
 import requests
+import heapq
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
 import os
 from dotenv import load_dotenv
 
+from article_archive import ArticleArchive
+from feed_cache import FeedCache
+from feed_fetcher import ConcurrentFeedFetcher
+from feed_replay import build_session
+from fulltext_fetcher import FullTextCache, FullTextFetcher
+from poll_scheduler import PollScheduler
+from seen_store import SeenArticleStore
+from source_adapters import CircuitBreaker, SourceScheduler, build_adapters
+import json_sources  # noqa: F401 - enregistre les adapters JSON (dev.to, Reddit)
+from scoring_engine import ArticleScorer
+from story_clusterer import StoryClusterer
+from trend_engine import TrendEngine
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -34,10 +47,8 @@ class JT3DScraper:
         "https://hackster.io/rss.xml",
         "https://github.com/topics/3d-printing/feed",
         "https://medium.com/feed/tag/3d-printing",
-        "https://dev.to/api/articles?tag=3dprinting",
-        "https://www.reddit.com/r/3Dprinting/.rss",
-        "https://www.reddit.com/r/Makers/.rss",
     ]
+    # dev.to et Reddit sont des APIs JSON : voir DevToAdapter / RedditAdapter (json_sources.py)
     
     # Twitter/X Keywords
     TWITTER_KEYWORDS = [
@@ -57,7 +68,7 @@ class JT3DScraper:
         "makers"
     ]
     
-    # Reddit subreddits
+    # Reddit subreddits (listing JSON combiné)
     REDDIT_SUBREDDITS = [
         "r/3Dprinting",
         "r/Makers",
@@ -66,64 +77,224 @@ class JT3DScraper:
         "r/Resin3D"
     ]
     
-    def __init__(self):
-        """Initialise le scraper"""
+    def __init__(self, config: Dict = None):
+        """Initialise le scraper (config = section "scraper" de config.json)"""
+        self.config = config or {}
         self.google_api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
         self.twitter_api_key = os.getenv("TWITTER_API_KEY")
         self.reddit_client_id = os.getenv("REDDIT_CLIENT_ID")
+        self.entries_per_feed = self.config.get("entries_per_feed", 5)
+        self.rss_feeds = self.config.get("rss_feeds") or self.RSS_FEEDS
+        
+        # live | record (archive les réponses) | replay (rejoue l'archive, hors ligne)
+        self.http_mode = self.config.get("http_mode", "live")
+        self.session = build_session(self.http_mode, self.config.get("http_archive", "data/http_archive.jsonl.gz"))
+        self.feed_cache = None
+        if self.config.get("feed_cache", True):
+            self.feed_cache = FeedCache(
+                cache_dir=self.config.get("feed_cache_dir", "data/feed_cache"),
+                max_feeds=self.config.get("feed_cache_max_feeds", 200),
+                max_mb=self.config.get("feed_cache_max_mb", 20)
+            )
+        self.fetcher = ConcurrentFeedFetcher(
+            max_workers=self.config.get("max_workers", 8),
+            connect_timeout=self.config.get("connect_timeout", 5),
+            read_timeout=self.config.get("read_timeout", 15),
+            per_domain_limit=self.config.get("per_domain_limit", 2),
+            time_budget=self.config.get("time_budget", 60),
+            session=self.session,
+            cache=self.feed_cache
+        )
+        # Polling adaptatif : chaque flux n'est récupéré que lorsqu'il est dû
+        self.poll_scheduler = None
+        if self.config.get("adaptive_polling", False):
+            self.poll_scheduler = PollScheduler(
+                state_file=self.config.get("poll_state", "data/poll_schedule.json"),
+                min_interval=self.config.get("poll_min_interval", 600),
+                max_interval=self.config.get("poll_max_interval", 79200),
+                jitter=self.config.get("poll_jitter", 0.1)
+            )
+        # Texte complet des meilleures histoires (pages liées, cache disque par URL)
+        self.full_text = None
+        self.full_text_top_n = self.config.get("full_text_top_n", 5)
+        if self.config.get("full_text", False):
+            self.full_text = FullTextFetcher(
+                session=self.session,
+                cache=FullTextCache(
+                    cache_dir=self.config.get("full_text_cache_dir", "data/fulltext_cache"),
+                    max_files=self.config.get("full_text_cache_max_files", 500)
+                ),
+                max_workers=self.config.get("full_text_workers", 4),
+                connect_timeout=self.config.get("connect_timeout", 5),
+                read_timeout=self.config.get("read_timeout", 15),
+                max_bytes=self.config.get("full_text_max_kb", 1024) * 1024,
+                parse_timeout=self.config.get("full_text_parse_timeout", 2),
+                time_budget=self.config.get("full_text_time_budget", 20)
+            )
+        self.cluster_distance = self.config.get("cluster_max_distance", 6)
+        self.breaker = CircuitBreaker(
+            state_file=self.config.get("breaker_state", "data/source_breakers.json"),
+            max_failures=self.config.get("breaker_failures", 3),
+            cooldown=self.config.get("breaker_cooldown", 3600)
+        )
+        self.scorer = ArticleScorer(self.config.get("scoring", {}))
+        # Tendances : comptes quotidiens des termes (Parquet), bursts rafraîchis à chaque run
+        self.trends = None
+        if self.config.get("trends", False):
+            self.trends = TrendEngine(
+                store_dir=self.config.get("trend_dir", "data/trends"),
+                baseline_days=self.config.get("trend_baseline_days", 28),
+                recent_days=self.config.get("trend_recent_days", 2),
+                min_count=self.config.get("trend_min_count", 3),
+                min_burst=self.config.get("trend_min_burst", 2.0),
+                weight=self.config.get("trend_weight", 5),
+                cap=self.config.get("trend_cap", 20),
+                min_history_days=self.config.get("trend_min_history_days", 7)
+            )
+            self.scorer.trends = self.trends
+        self.seen_store = None
+        if self.config.get("seen_store", True):
+            self.seen_store = SeenArticleStore(
+                db_path=self.config.get("seen_db", "data/seen_articles.db"),
+                ttl_days=self.config.get("seen_ttl_days", 30)
+            )
+        # Archive plein texte de tous les articles retournés (histoires liées)
+        self.archive = None
+        if self.config.get("archive", False):
+            self.archive = ArticleArchive(
+                db_path=self.config.get("archive_db", "data/article_archive.db"),
+                retention_days=self.config.get("archive_retention_days", 365)
+            )
+        # Pertinence sémantique (EmbeddingRelevance), branchée par la pipeline qui possède le client Ollama
+        self.relevance = None
         logger.info("🔍 JT3D Scraper initialized")
     
     def scrape_all_sources(self, hours: int = 24) -> List[Dict]:
         """Scrape toutes les sources"""
-        all_news = []
+        event = {"ranking": []}
+        for event in self.scrape_iter(hours=hours):
+            pass
         
-        logger.info("📡 Scraping RSS feeds...")
-        all_news.extend(self._scrape_rss_feeds())
-        
-        logger.info("🐦 Scraping Twitter/X...")
-        all_news.extend(self._scrape_twitter())
+        all_news = event["ranking"]
+        logger.info(f"✅ {len(all_news)} articles trouvés et scorés")
+        return all_news
+    
+    def scrape_iter(self, hours: int = 24, top_k: int = 5) -> Iterator[Dict]:
+        """
+        Scrape en streaming : un événement par source terminée
         
-        logger.info("📷 Scraping Instagram...")
-        all_news.extend(self._scrape_instagram())
+        Chaque événement contient les histoires nouvelles/mises à jour par la source
+        ("updated") et le top-K courant ("top"). Le dernier événement a done=True
+        et contient le classement complet ("ranking").
+        """
+        clusterer = StoryClusterer(max_distance=self.cluster_distance)
+        stories = {}  # cluster id -> histoire scorée
+        if self.trends:
+            self.trends.refresh()
+        ingested = 0
         
-        logger.info("🔗 Scraping Reddit...")
-        all_news.extend(self._scrape_reddit())
+        for source, articles in self._iter_source_batches():
+            ingested += len(articles)
+            # Retire les articles déjà publiés lors des runs précédents
+            if self.seen_store:
+                articles = self.seen_store.filter_unseen(articles)
+            if not articles:
+                continue
+            
+            # Regroupe les reprises d'une même annonce en une seule histoire
+            touched = {clusterer.add(article) for article in articles}
+            touched = {clusterer.root(cluster_id) for cluster_id in touched}
+            for cluster_id in [c for c in stories if not clusterer.is_root(c)]:
+                del stories[cluster_id]
+            
+            # Filtre et score les seules histoires touchées par cette source
+            updated = {cluster_id: clusterer.cluster_story(cluster_id) for cluster_id in touched}
+            kept = self._filter_and_score(list(updated.values()), hours)
+            kept_ids = {id(story) for story in kept}
+            for cluster_id, story in updated.items():
+                if id(story) in kept_ids:
+                    stories[cluster_id] = story
+                else:
+                    stories.pop(cluster_id, None)
+            
+            yield {
+                "source": source,
+                "updated": kept,
+                "top": heapq.nlargest(top_k, stories.values(), key=self._rank_key),
+                "done": False
+            }
         
-        logger.info("📹 Scraping YouTube...")
-        all_news.extend(self._scrape_youtube())
+        if clusterer.cluster_count() < len(clusterer.articles):
+            logger.info(f"🧩 {len(clusterer.articles)} articles regroupés en {clusterer.cluster_count()} histoires")
         
-        logger.info("🔎 Scraping Google News...")
-        all_news.extend(self._scrape_google_news())
+        # Comptage des termes sur toutes les histoires dédoublonnées, pas seulement celles qui ont passé
+        # min_score : ce score inclut déjà le bonus de tendance, qui alimenterait ses propres bursts.
+        # Les bonus de ce run viennent de refresh() au démarrage, avant ce comptage.
+        if self.trends:
+            self.trends.update(clusterer.stories())
         
-        # Filtre et score
-        all_news = self._filter_and_score(all_news, hours)
+        # Trie par score (les histoires hors sujet selon les embeddings passent après)
+        ranking = sorted(stories.values(), key=self._rank_key, reverse=True)
+        self.fetch_full_text(ranking[:self.full_text_top_n])
+        self.archive_articles(ranking)
         
-        # Trie par score
-        all_news.sort(key=lambda x: x.get("score", 0), reverse=True)
+        if self.http_mode == "record":
+            self.session.save()
         
-        logger.info(f"✅ {len(all_news)} articles trouvés et scorés")
-        return all_news
+        yield {"source": None, "updated": [], "top": ranking[:top_k], "ranking": ranking,
+               "articles_in": ingested, "done": True}
+    
+    def _iter_source_batches(self) -> Iterator[Tuple[str, List[Dict]]]:
+        """Produit (source, articles) dès qu'une source livre un lot"""
+        scheduler = SourceScheduler(
+            build_adapters(self, self.config.get("sources", {})),
+            self.breaker,
+            deadline=self.config.get("source_deadline", 90),
+            cost_budget=self.config.get("source_cost_budget")
+        )
+        return scheduler.run()
+    
+    def fetch_full_text(self, stories: List[Dict]) -> int:
+        """Ajoute le texte complet de la page (full_text) aux histoires, si activé"""
+        if not self.full_text or not stories:
+            return 0
+        return self.full_text.enrich(stories)
+    
+    def archive_articles(self, articles: List[Dict]) -> int:
+        """Ajoute des articles à l'archive plein texte, si activée"""
+        if not self.archive or not articles:
+            return 0
+        try:
+            return self.archive.add_many(articles)
+        except Exception as e:
+            logger.warning(f"⚠️ Archive indisponible: {e}")
+            return 0
+    
+    def related_stories(self, article: Dict, days: float = None, limit: int = 5) -> List[Dict]:
+        """Histoires archivées liées à un article sur les derniers jours"""
+        if not self.archive:
+            return []
+        return self.archive.related(article, days=days or self.config.get("related_days", 14), limit=limit)
+    
+    def mark_processed(self, articles: List[Dict]):
+        """Mémorise des articles traités pour les ignorer aux prochains runs"""
+        if self.seen_store:
+            # Les reprises d'une histoire sont marquées avec elle
+            duplicates = [dup for article in articles for dup in article.get("duplicates", [])]
+            self.seen_store.mark_seen(articles + duplicates)
     
-    def _scrape_rss_feeds(self) -> List[Dict]:
-        """Scrape les RSS feeds"""
+    def _feed_to_articles(self, feed: Dict) -> List[Dict]:
+        """Convertit un flux téléchargé en articles"""
         articles = []
-        
-        for feed_url in self.RSS_FEEDS:
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:5]:  # Top 5 par feed
-                    article = {
-                        "title": entry.get("title", ""),
-                        "content": entry.get("summary", ""),
-                        "source": feed.feed.get("title", "Unknown"),
-                        "link": entry.get("link", ""),
-                        "published": entry.get("published", datetime.now().isoformat()),
-                        "type": "rss"
-                    }
-                    articles.append(article)
-            except Exception as e:
-                logger.warning(f"Erreur RSS {feed_url}: {e}")
-        
+        for entry in feed["entries"][:self.entries_per_feed]:  # Top N par feed
+            articles.append({
+                "title": entry["title"],
+                "content": entry["summary"],
+                "source": feed["title"],
+                "link": entry["link"],
+                "published": entry["published"],
+                "type": "rss"
+            })
         return articles
     
     def _scrape_twitter(self) -> List[Dict]:
@@ -160,15 +331,6 @@ class JT3DScraper:
         
         return articles
     
-    def _scrape_reddit(self) -> List[Dict]:
-        """Scrape Reddit"""
-        articles = []
-        
-        # Les RSS feeds Reddit couvrent déjà les subreddits
-        # Voir RSS_FEEDS pour r/3Dprinting et r/Makers
-        
-        return articles
-    
     def _scrape_youtube(self) -> List[Dict]:
         """Scrape YouTube (via API ou search)"""
         articles = []
@@ -214,7 +376,7 @@ class JT3DScraper:
     
     def _filter_and_score(self, articles: List[Dict], hours: int = 24) -> List[Dict]:
         """Filtre et score les articles"""
-        filtered = []
+        recent = []
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
         for article in articles:
@@ -225,32 +387,19 @@ class JT3DScraper:
                     continue
             except:
                 pass
-            
-            # Scoring
-            score = 0
-            
-            # Keywords 3D printing
-            keywords = ["3d print", "prototype", "additive", "print", "impression"]
-            for kw in keywords:
-                if kw.lower() in article["title"].lower():
-                    score += 10
-                if kw.lower() in article["content"].lower():
-                    score += 5
-            
-            # Source prestige
-            prestige_sources = ["Prusa", "Formlabs", "Stratasys", "3D Systems", "All3DP"]
-            for source in prestige_sources:
-                if source.lower() in article["source"].lower():
-                    score += 20
-            
-            # Récence (bonus)
-            score += 5  # Tous les articles sont récents
-            
-            article["score"] = score
-            if score > 5:  # Threshold
-                filtered.append(article)
+            recent.append(article)
         
+        # Scoring en un seul passage sur tout le batch
+        scores = self.scorer.score_many(recent)
+        filtered = [article for article, score in zip(recent, scores) if score > self.scorer.threshold]
+        
+        if self.relevance:
+            self.relevance.score_many(filtered)
         return filtered
+    
+    @staticmethod
+    def _rank_key(article: Dict) -> Tuple[bool, int]:
+        return article.get("relevant", True), article.get("score", 0)
 
 
 def main():
@@ -11,14 +11,22 @@ import os
 from typing import Dict
 from dotenv import load_dotenv
 
+from duration_model import spoken_parts, spoken_text
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class GeminiScriptGenerator:
     """Génère les scripts JT - Utilise Ollama/fallback (Gemini désactivé pour économiser le quota)"""
     
-    def __init__(self, api_key: str = None):
-        """Initialise - Gemini optionnel car on utilise Ollama/fallback"""
+    def __init__(self, api_key: str = None, duration_model=None, voice: str = "denise"):
+        """Initialise - Gemini optionnel car on utilise Ollama/fallback
+
+        duration_model (DurationModel, optionnel) estime la durée parlée de chaque
+        segment pour la voix `voice` : la timeline est connue avant le TTS.
+        """
+        self.duration_model = duration_model
+        self.voice = voice
         api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.gemini_enabled = False
         
@@ -40,15 +48,52 @@ class GeminiScriptGenerator:
         logger.info(f"✍️ Using Ollama/fallback instead of Gemini (API quota exhausted)...")
         
         # Génère le script avec les infos extraites
-        return {
+        segments = [
+            {"speaker": "Kara", "text": extracted_info.get('summary', 'News du jour...'), "duration": duration - 20, "animation": "idle_sitting"}
+        ]
+        # Mode combiné d'Ollama : un segment par phrase, avec ses indices d'animation
+        cues = (extracted_info.get("animation") or {}).get("segments") or []
+        if cues:
+            total_chars = sum(len(cue["text"]) for cue in cues) or 1
+            segments = [{
+                "speaker": "Kara",
+                "text": cue["text"],
+                "duration": round((duration - 20) * len(cue["text"]) / total_chars, 2),
+                "animation": "idle_sitting",
+                "emotion": cue.get("emotion", "neutral"),
+                "gesture": cue.get("gesture", "none"),
+                "head_movement": cue.get("head_movement", "center")
+            } for cue in cues]
+        
+        script = {
             "opening": {"speaker": "Kara", "text": "Bonjour! Bienvenue sur JT 3D Printing News!", "duration": 10, "animation": "walk_to_chair"},
-            "segments": [
-                {"speaker": "Kara", "text": extracted_info.get('summary', 'News du jour...'), "duration": duration - 20, "animation": "idle_sitting"}
-            ],
+            "segments": segments,
             "closing": {"speaker": "Kara", "text": "À demain pour plus de news 3D!", "duration": 10, "animation": "idle_sitting"},
             "total_duration": duration,
             "animations_needed": ["walk_to_chair", "sit_down", "idle_sitting"]
         }
+        if self.duration_model:
+            self._plan_timeline(script)
+        return script
+    
+    def _plan_timeline(self, script: Dict):
+        """Durées estimées de la voix (avant TTS) et début de chaque partie sur la timeline
+
+        La durée totale est estimée sur le texte exact envoyé au TTS (celui sur lequel le
+        modèle est recalibré) ; les parties s'en partagent la durée au prorata de leur estimation.
+        """
+        parts = spoken_parts(script)
+        total = self.duration_model.estimate(spoken_text(script), self.voice)
+        estimates = [self.duration_model.estimate(part["text"], self.voice) for part in parts]
+        scale = total / sum(estimates) if sum(estimates) else 0.0
+        start = 0.0
+        for part, estimate in zip(parts, estimates):
+            part["start"] = round(start, 2)
+            part["duration"] = round(estimate * scale, 2)
+            start += estimate * scale
+        script["total_duration"] = total
+        logger.info(f"⏱️ Durée estimée ({self.voice}): {script['total_duration']:.1f}s "
+                    f"pour {len(script['segments']) + 2} parties")
     
     def generate_series_episode(self, episode_info: Dict, duration: int = 600) -> Dict:
         """Génère un épisode de mini-série (~10 min)"""
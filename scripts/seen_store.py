@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Seen Article Store
+Mémoire persistante (SQLite) des articles déjà traités, pour ne pas
+re-publier la même news d'un run à l'autre
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Paramètres de tracking ignorés dans les liens ("ref" ou "source" sont du contenu sur certains sites)
+TRACKING_PARAMS = {"fbclid", "gclid"}
+TRACKING_PREFIXES = ("utm_", "mc_")
+
+
+class SeenArticleStore:
+    """Articles déjà traités, clé = lien normalisé + hash du contenu"""
+
+    def __init__(self, db_path: str = "data/seen_articles.db", ttl_days: float = 30):
+        """
+        Initialise le store
+
+        Args:
+            db_path: Fichier SQLite
+            ttl_days: Durée de rétention d'un article vu (jours)
+        """
+        self.db_path = db_path
+        self.ttl_days = ttl_days
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " link TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " title TEXT,"
+            " seen_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_hash ON seen(content_hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_at ON seen(seen_at)")
+        self.conn.commit()
+
+        self.prune()
+
+        # Tout le store tient en mémoire (borné par le TTL) : membership en O(1)
+        self._links = set()
+        self._hashes = set()
+        for link, content_hash in self.conn.execute("SELECT link, content_hash FROM seen"):
+            self._links.add(link)
+            self._hashes.add(content_hash)
+
+        logger.info(f"🧠 Seen store: {len(self._links)} articles déjà traités")
+
+    def is_seen(self, article: Dict) -> bool:
+        """True si l'article (même lien ou même contenu) a déjà été traité"""
+        return (self._key(article) in self._links
+                or self.content_hash(article) in self._hashes)
+
+    def filter_unseen(self, articles: List[Dict]) -> List[Dict]:
+        """Retire les articles déjà traités"""
+        unseen = [article for article in articles if not self.is_seen(article)]
+        if len(unseen) < len(articles):
+            logger.info(f"🧠 {len(articles) - len(unseen)} articles déjà traités ignorés")
+        return unseen
+
+    def mark_seen(self, articles: List[Dict]):
+        """Enregistre des articles comme traités"""
+        now = time.time()
+        rows = []
+        for article in articles:
+            key = self._key(article)
+            content_hash = self.content_hash(article)
+            rows.append((key, content_hash, article.get("title", ""), now))
+            self._links.add(key)
+            self._hashes.add(content_hash)
+
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO seen (link, content_hash, title, seen_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def prune(self, ttl_days: float = None) -> int:
+        """Supprime les entrées plus vieilles que le TTL, retourne le nombre supprimé"""
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = time.time() - ttl_days * 86400
+        with self._lock:
+            deleted = self.conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+            self.conn.commit()
+        if deleted:
+            logger.info(f"🧹 Seen store: {deleted} entrées expirées supprimées")
+        return deleted
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def normalize_link(link: str) -> str:
+        """Normalise un lien : host en minuscules, sans www, fragment ni tracking"""
+        if not link:
+            return ""
+        parsed = urlparse(link.strip())
+        host = parsed.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        query = [(k, v) for k, v in parse_qsl(parsed.query)
+                 if not k.lower().startswith(TRACKING_PREFIXES) and k.lower() not in TRACKING_PARAMS]
+        path = parsed.path.rstrip("/") or "/"
+        return urlunparse(("https", host, path, "", urlencode(sorted(query)), ""))
+
+    @staticmethod
+    def content_hash(article: Dict) -> str:
+        """Hash du titre + contenu normalisés (insensible à la casse et la ponctuation)"""
+        text = f"{article.get('title', '')} {article.get('content', '')}".lower()
+        text = re.sub(r"[\W_]+", " ", text).strip()
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _key(self, article: Dict) -> str:
+        """Clé primaire : lien normalisé, ou hash si l'article n'a pas de lien"""
+        return self.normalize_link(article.get("link", "")) or f"hash:{self.content_hash(article)}"
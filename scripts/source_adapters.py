@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Source Adapters
+Registre des sources de news (coût, timeout, rate limit, priorité),
+circuit breaker par source et ordonnanceur concurrent sous deadline globale
+"""
+
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SOURCE_REGISTRY = {}
+
+
+def register_source(cls):
+    """Décorateur : ajoute un adapter au registre des sources (refuse un adapter incomplet)"""
+    if inspect.isabstract(cls):
+        raise TypeError(f"{cls.__name__}: méthodes non implémentées ({', '.join(sorted(cls.__abstractmethods__))})")
+    SOURCE_REGISTRY[cls.name] = cls
+    return cls
+
+
+class SourceAdapter(ABC):
+    """Source de news : métadonnées d'ordonnancement + récupération des articles"""
+
+    name = "base"
+    label = "Scraping..."
+    cost = 1             # Coût relatif (requêtes, quota API)
+    timeout = 30.0       # Durée max de la source (s)
+    rate_limit = 0.0     # Intervalle min entre deux runs de la source (s)
+    priority = 50        # Les priorités hautes démarrent en premier
+
+    def __init__(self, scraper, **overrides):
+        """
+        Initialise l'adapter
+
+        Args:
+            scraper: JT3DScraper propriétaire (clés API, fetcher, listes de sources)
+            overrides: Valeurs de config qui remplacent cost/timeout/rate_limit/priority
+        """
+        self.scraper = scraper
+        for key in ("cost", "timeout", "rate_limit", "priority"):
+            if key in overrides:
+                setattr(self, key, overrides[key])
+
+    def iter_batches(self) -> Iterator[List[Dict]]:
+        """Produit les articles par lots (un seul lot par défaut)"""
+        yield self.fetch()
+
+    @abstractmethod
+    def fetch(self) -> List[Dict]:
+        """Tous les articles de la source"""
+
+
+class BatchedSourceAdapter(SourceAdapter):
+    """Source qui produit ses articles en plusieurs lots (flux, pages d'API)"""
+
+    @abstractmethod
+    def iter_batches(self) -> Iterator[List[Dict]]:
+        """Produit les articles lot par lot, au fil des téléchargements"""
+
+    def fetch(self) -> List[Dict]:
+        return [article for batch in self.iter_batches() for article in batch]
+
+
+@register_source
+class RSSAdapter(BatchedSourceAdapter):
+    name = "rss"
+    label = "📡 Scraping RSS feeds..."
+    cost = 16
+    timeout = 75.0
+    priority = 100
+
+    def iter_batches(self) -> Iterator[List[Dict]]:
+        """Un lot par flux, dès qu'il est téléchargé (flux pas encore dus : entrées du cache)"""
+        scheduler = self.scraper.poll_scheduler
+        cache = self.scraper.feed_cache
+        urls = self.scraper.rss_feeds
+
+        if scheduler:
+            due = []
+            for url in urls:
+                cached = cache.get(url) if cache else None
+                if cached is None or scheduler.is_due(url):
+                    due.append(url)
+                else:
+                    yield self.scraper._feed_to_articles(cached)
+            if len(due) < len(urls):
+                logger.info(f"🗓️ {len(urls) - len(due)} flux RSS pas encore dus, servis depuis le cache")
+            urls = due
+
+        timed_out = []
+        try:
+            for feed in self.scraper.fetcher.iter_fetch(urls):
+                if feed["status"] == "ok":
+                    if scheduler:
+                        scheduler.record_success(feed["url"], feed["entries"])
+                    yield self.scraper._feed_to_articles(feed)
+                else:
+                    if feed["status"] == "timeout":
+                        timed_out.append(feed["url"])
+                    if scheduler and feed["error"] != "time budget exceeded":
+                        scheduler.record_failure(feed["url"])
+        finally:
+            if scheduler:
+                scheduler.save()
+        if timed_out:
+            logger.warning(f"⏱️ {len(timed_out)} flux RSS hors budget: {', '.join(timed_out)}")
+
+
+@register_source
+class TwitterAdapter(SourceAdapter):
+    name = "twitter"
+    label = "🐦 Scraping Twitter/X..."
+    cost = 5
+    timeout = 20.0
+    rate_limit = 900.0  # Fenêtre de 15 min de l'API X
+    priority = 40
+
+    def fetch(self) -> List[Dict]:
+        return self.scraper._scrape_twitter()
+
+
+@register_source
+class InstagramAdapter(SourceAdapter):
+    name = "instagram"
+    label = "📷 Scraping Instagram..."
+    cost = 5
+    timeout = 20.0
+    rate_limit = 3600.0
+    priority = 20
+
+    def fetch(self) -> List[Dict]:
+        return self.scraper._scrape_instagram()
+
+
+@register_source
+class YouTubeAdapter(SourceAdapter):
+    name = "youtube"
+    label = "📹 Scraping YouTube..."
+    cost = 3
+    timeout = 20.0
+    rate_limit = 3600.0  # Quota YouTube Data API
+    priority = 30
+
+    def fetch(self) -> List[Dict]:
+        return self.scraper._scrape_youtube()
+
+
+@register_source
+class GoogleNewsAdapter(SourceAdapter):
+    name = "google_news"
+    label = "🔎 Scraping Google News..."
+    cost = 3
+    timeout = 20.0
+    priority = 50
+
+    def fetch(self) -> List[Dict]:
+        return self.scraper._scrape_google_news()
+
+
+class CircuitBreaker:
+    """Coupe une source après N échecs consécutifs pendant un cool-down (état persisté)"""
+
+    def __init__(self, state_file: str = "data/source_breakers.json", max_failures: int = 3,
+                 cooldown: float = 3600):
+        """
+        Initialise le circuit breaker
+
+        Args:
+            state_file: Fichier JSON de l'état entre deux runs
+            max_failures: Échecs consécutifs avant ouverture du circuit
+            cooldown: Durée pendant laquelle la source est ignorée (s)
+        """
+        self.state_file = state_file
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.state = {}
+
+        try:
+            with open(state_file, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def allow(self, adapter: SourceAdapter) -> bool:
+        """True si la source peut tourner (circuit fermé et rate limit respecté)"""
+        source = self.state.get(adapter.name, {})
+        now = time.time()
+        if source.get("open_until", 0) > now:
+            logger.info(f"🔌 {adapter.name}: circuit ouvert encore {source['open_until'] - now:.0f}s, ignorée")
+            return False
+        if adapter.rate_limit and now - source.get("last_run", 0) < adapter.rate_limit:
+            logger.info(f"⏳ {adapter.name}: rate limit ({adapter.rate_limit:.0f}s), ignorée")
+            return False
+        return True
+
+    def record_success(self, name: str):
+        with self._lock:
+            self.state[name] = {"failures": 0, "open_until": 0, "last_run": time.time()}
+
+    def record_failure(self, name: str, reason: str):
+        with self._lock:
+            source = self.state.setdefault(name, {"failures": 0, "open_until": 0})
+            source["failures"] = source.get("failures", 0) + 1
+            source["last_run"] = time.time()
+            if source["failures"] >= self.max_failures:
+                source["open_until"] = time.time() + self.cooldown
+                logger.warning(f"🔌 {name}: {source['failures']} échecs ({reason}), circuit ouvert {self.cooldown:.0f}s")
+
+    def save(self):
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        with self._lock:
+            with open(self.state_file, "w") as f:
+                json.dump(self.state, f, indent=2)
+
+
+class SourceScheduler:
+    """Lance les sources en parallèle et produit leurs lots sous une deadline globale"""
+
+    _DONE = object()
+
+    def __init__(self, adapters: List[SourceAdapter], breaker: CircuitBreaker,
+                 deadline: float = 90.0, cost_budget: float = None):
+        """
+        Initialise l'ordonnanceur
+
+        Args:
+            adapters: Sources à lancer
+            breaker: Circuit breaker partagé
+            deadline: Durée max de tout le scrape (s)
+            cost_budget: Coût cumulé max des sources lancées (None = illimité)
+        """
+        self.adapters = sorted(adapters, key=lambda a: a.priority, reverse=True)
+        self.breaker = breaker
+        self.deadline = deadline
+        self.cost_budget = cost_budget
+
+    def run(self) -> Iterator[Tuple[str, List[Dict]]]:
+        """Produit (source, articles) dès qu'une source livre un lot"""
+        start = time.monotonic()
+        results = queue.Queue()
+        running = {}  # nom -> heure de démarrage
+        spent = 0
+
+        for adapter in self.adapters:
+            if not self.breaker.allow(adapter):
+                continue
+            if self.cost_budget is not None and spent + adapter.cost > self.cost_budget:
+                logger.info(f"💸 {adapter.name}: budget de coût atteint ({spent}/{self.cost_budget}), ignorée")
+                continue
+            spent += adapter.cost
+            logger.info(adapter.label)
+            running[adapter.name] = (adapter, time.monotonic())
+            # Threads daemon : une source bloquée ne retient pas la fin du process
+            threading.Thread(target=self._worker, args=(adapter, results),
+                             name=f"source-{adapter.name}", daemon=True).start()
+
+        try:
+            while running:
+                now = time.monotonic()
+                # Sources hors de leur propre timeout
+                for name, (adapter, started) in list(running.items()):
+                    if now - started > adapter.timeout:
+                        del running[name]
+                        self.breaker.record_failure(name, f"timeout {adapter.timeout:.0f}s")
+                if not running:
+                    break
+
+                next_timeout = min(started + adapter.timeout for adapter, started in running.values())
+                wait = min(start + self.deadline, next_timeout) - now
+                if start + self.deadline - now <= 0:
+                    break
+                try:
+                    name, payload = results.get(timeout=max(0.01, wait))
+                except queue.Empty:
+                    continue
+
+                if name not in running:
+                    continue  # Source déjà abandonnée
+                if payload is self._DONE:
+                    del running[name]
+                    self.breaker.record_success(name)
+                elif isinstance(payload, Exception):
+                    del running[name]
+                    logger.warning(f"⚠️ Source {name} en erreur: {payload}")
+                    self.breaker.record_failure(name, str(payload))
+                else:
+                    yield name, payload
+
+            for name in running:
+                logger.warning(f"⏱️ Source {name} hors deadline globale ({self.deadline:.0f}s)")
+                self.breaker.record_failure(name, "global deadline")
+        finally:
+            self.breaker.save()
+
+    def _worker(self, adapter: SourceAdapter, results: queue.Queue):
+        try:
+            for batch in adapter.iter_batches():
+                results.put((adapter.name, batch))
+            results.put((adapter.name, self._DONE))
+        except Exception as e:
+            results.put((adapter.name, e))
+
+
+def build_adapters(scraper, sources_config: Dict = None) -> List[SourceAdapter]:
+    """Instancie les sources du registre (config: {nom: {"enabled": bool, overrides...}})"""
+    sources_config = sources_config or {}
+    adapters = []
+    for name, cls in SOURCE_REGISTRY.items():
+        overrides = dict(sources_config.get(name, {}))
+        if not overrides.pop("enabled", True):
+            continue
+        adapters.append(cls(scraper, **overrides))
+    return adapters
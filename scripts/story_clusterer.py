@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Story Clusterer
+Regroupe les quasi-doublons (même annonce reprise par plusieurs sources)
+avec un SimHash 64 bits sur les shingles titre + résumé, indexé par bandes
+"""
+
+import hashlib
+import logging
+import re
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+
+# Mots trop fréquents pour caractériser une news (EN + FR)
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "is", "its", "at", "by",
+    "from", "this", "that", "new", "le", "la", "les", "un", "une", "des", "de", "du", "et", "en",
+    "pour", "sur", "avec", "est", "au", "aux"
+}
+
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class StoryClusterer:
+    """Clustering incrémental des articles en histoires"""
+
+    def __init__(self, max_distance: int = 6, shingle_size: int = 2, title_weight: int = 2):
+        """
+        Initialise le clusterer
+
+        Args:
+            max_distance: Distance de Hamming max entre deux SimHash du même cluster
+            shingle_size: Nombre de mots par shingle
+            title_weight: Poids des shingles du titre par rapport au résumé
+        """
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.title_weight = title_weight
+
+        # Principe des tiroirs : avec max_distance + 1 bandes, deux hashs à distance
+        # <= max_distance ont au moins une bande identique
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+
+        self.articles = []
+        self.hashes = []
+        self._parent = []
+        self._members = {}
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def add(self, article: Dict) -> int:
+        """Ajoute un article, retourne l'id de son cluster"""
+        idx = len(self.articles)
+        fingerprint = self.simhash(article)
+        self.articles.append(article)
+        self.hashes.append(fingerprint)
+        self._parent.append(idx)
+        self._members[idx] = [idx]
+        if fingerprint is None:
+            return idx  # Aucun mot : rien à comparer, l'article reste seul
+
+        # Candidats dédoublonnés : un voisin partageant plusieurs bandes n'est comparé qu'une fois
+        candidates = set()
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            bucket = self._buckets[band][key]
+            candidates.update(bucket)
+            bucket.append(idx)
+
+        for other in candidates:
+            if self._find(other) != self._find(idx) and \
+                    bin(fingerprint ^ self.hashes[other]).count("1") <= self.max_distance:
+                self._union(other, idx)
+
+        return self._find(idx)
+
+    def root(self, idx: int) -> int:
+        """Id du cluster contenant l'article `idx`"""
+        return self._find(idx)
+
+    def is_root(self, cluster_id: int) -> bool:
+        """False si le cluster a été fusionné dans un autre"""
+        return cluster_id in self._members
+
+    def cluster_count(self) -> int:
+        """Nombre de clusters"""
+        return len(self._members)
+
+    def cluster_story(self, cluster_id: int) -> Dict:
+        """Histoire fusionnée d'un cluster"""
+        return self.story(self._members[self._find(cluster_id)])
+
+    def cluster(self, articles: List[Dict]) -> List[Dict]:
+        """Ajoute une liste d'articles et retourne les histoires regroupées"""
+        for article in articles:
+            self.add(article)
+        stories = self.stories()
+        if len(stories) < len(articles):
+            logger.info(f"🧩 {len(articles)} articles regroupés en {len(stories)} histoires")
+        return stories
+
+    def stories(self) -> List[Dict]:
+        """Une histoire par cluster, avec tous les liens et sources"""
+        return [self.story(members) for members in self._members.values()]
+
+    def story(self, members: List[int]) -> Dict:
+        """Fusionne un cluster en une histoire (article le plus complet comme base)"""
+        members = sorted(members, key=lambda i: len(self.articles[i].get("content", "")), reverse=True)
+        story = dict(self.articles[members[0]])
+
+        links, sources = [], []
+        for i in members:
+            article = self.articles[i]
+            if article.get("link") and article["link"] not in links:
+                links.append(article["link"])
+            if article.get("source") and article["source"] not in sources:
+                sources.append(article["source"])
+
+        story["links"] = links
+        story["sources"] = sources
+        story["cluster_size"] = len(members)
+        story["duplicates"] = [
+            {"title": self.articles[i].get("title", ""),
+             "link": self.articles[i].get("link", ""),
+             "source": self.articles[i].get("source", "")}
+            for i in members[1:]
+        ]
+        return story
+
+    def simhash(self, article: Dict) -> Optional[int]:
+        """SimHash 64 bits pondéré des shingles du titre et du résumé (None si aucun mot)"""
+        weights = defaultdict(int)
+        for shingle in self._shingles(article.get("title", "")):
+            weights[shingle] += self.title_weight
+        for shingle in self._shingles(TAG_RE.sub(" ", article.get("content", ""))):
+            weights[shingle] += 1
+
+        if not weights:
+            # Un hash 0 commun rapprocherait tous les articles vides
+            return None
+
+        # Matrice shingles x 64 bits (colonne 0 = bit de poids fort), somme pondérée vectorisée
+        digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+                           for shingle in weights)
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+        # sum(w * (2b - 1)) = 2 * (w @ b) - sum(w) : évite de convertir toute la matrice de bits
+        counts = np.fromiter(weights.values(), dtype=np.int64, count=len(weights))
+        vector = 2 * (counts @ bits) - counts.sum()
+        return int(np.packbits(vector > 0).view(">u8")[0])
+
+    def _shingles(self, text: str) -> List[str]:
+        words = [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+        if len(words) < self.shingle_size:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _find(self, idx: int) -> int:
+        while self._parent[idx] != idx:
+            self._parent[idx] = self._parent[self._parent[idx]]
+            idx = self._parent[idx]
+        return idx
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            keep, merged = min(root_a, root_b), max(root_a, root_b)
+            self._parent[merged] = keep
+            self._members[keep].extend(self._members.pop(merged))
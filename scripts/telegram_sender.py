@@ -1,21 +1,24 @@
 #!/usr/bin/env python3
 """
 JT 3D PRINTING NEWS - Telegram Sender
-Envoie la vidéo finale sur Telegram
+Envoie la vidéo finale sur Telegram (Bot API via le client HTTP partagé)
 """
 
-import telegram
 import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from http_client import shared_session
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class TelegramSender:
     """Envoie les vidéos sur Telegram"""
     
+    API_URL = "https://api.telegram.org/bot{token}/{method}"
+    
     def __init__(self, bot_token: str = None, chat_id: str = None):
         """Initialise le bot Telegram"""
         bot_token = bot_token or os.getenv("TELEGRAM_BOT_TOKEN")
@@ -23,17 +26,19 @@ class TelegramSender:
         
         if not bot_token or not chat_id:
             logger.warning("⚠️ Telegram config incomplete (optional for testing)")
-            self.bot = None
+            self.token = None
             self.chat_id = None
         else:
-            self.bot = telegram.Bot(token=bot_token)
+            # Appels HTTP directs : l'upload réutilise les connexions (et HTTP/2) du client partagé
+            self.token = bot_token
             self.chat_id = chat_id
+            self.session = shared_session()
             logger.info("✅ Telegram initialized")
     
     def send_video(self, video_file: str, caption: str = "🎬 JT 3D Printing News") -> bool:
         """Envoie une vidéo"""
         
-        if not self.bot or not self.chat_id:
+        if not self.token or not self.chat_id:
             logger.warning("⚠️ Telegram not configured, skipping send")
             return False
         
@@ -45,11 +50,11 @@ class TelegramSender:
             logger.info(f"📤 Sending video to Telegram: {video_file}")
             
             with open(video_file, 'rb') as f:
-                self.bot.send_video(
-                    chat_id=self.chat_id,
-                    video=f,
-                    caption=caption,
-                    supports_streaming=True
+                self._call(
+                    "sendVideo",
+                    data={"chat_id": self.chat_id, "caption": caption, "supports_streaming": "true"},
+                    files={"video": (Path(video_file).name, f, "video/mp4")},
+                    timeout=(10, 600)
                 )
             
             logger.info("✅ Video sent to Telegram!")
@@ -62,16 +67,29 @@ class TelegramSender:
     def send_message(self, message: str) -> bool:
         """Envoie un message"""
         
-        if not self.bot or not self.chat_id:
+        if not self.token or not self.chat_id:
             return False
         
         try:
-            self.bot.send_message(chat_id=self.chat_id, text=message)
+            self._call("sendMessage", json={"chat_id": self.chat_id, "text": message}, timeout=(10, 30))
             logger.info(f"✅ Message sent: {message[:50]}...")
             return True
         except Exception as e:
             logger.error(f"❌ Message send failed: {e}")
             return False
+    
+    def _call(self, method: str, **kwargs) -> dict:
+        """Appel Bot API ; lève une exception si Telegram refuse la requête"""
+        response = self.session.post(self.API_URL.format(token=self.token, method=method), **kwargs)
+        try:
+            result = response.json()
+        except ValueError:
+            # Page d'erreur HTML (5xx, proxy) : l'erreur HTTP est plus parlante que le JSON illisible
+            response.raise_for_status()
+            raise RuntimeError(f"{method}: réponse non JSON (HTTP {response.status_code})")
+        if not result.get("ok"):
+            raise RuntimeError(f"{method}: {result.get('description', response.status_code)}")
+        return result
 
 
 def main():
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Tests du modèle de durée parlée : NNLS et ajustement par voix"""
+
+import itertools
+
+import numpy as np
+
+from duration_model import DEFAULT_COEFFICIENTS, FEATURES, DurationModel, nnls, text_features
+
+SENTENCES = [
+    "Prusa annonce la Core One, une imprimante CoreXY fermée.",
+    "Le cadre en acier et la chambre chauffée visent les matériaux techniques.",
+    "Bambu Lab répond avec une mise à jour du firmware de la X1.",
+    "Chez Nikon SLM, la NXG 600E aligne douze lasers d'un kilowatt !",
+    "Les pièces en titane sortent en quelques heures ; l'aéronautique suit de près.",
+    "Côté résines, Formlabs baisse ses prix.",
+]
+
+
+def test_nnls_matches_best_non_negative_support():
+    rng = np.random.default_rng(0)
+    A = rng.random((25, 4))
+    A[:, 1] = 0.2 * A[:, 0] + rng.normal(0, 1e-3, 25)  # Colonnes presque colinéaires
+    b = A @ np.array([1.0, 0.0, 0.5, 2.0]) + rng.normal(0, 0.05, 25)
+    x = nnls(A, b)
+    best = np.inf
+    for size in range(5):
+        for support in map(list, itertools.combinations(range(4), size)):
+            z = np.zeros(4)
+            if support:
+                z[support] = np.linalg.lstsq(A[:, support], b, rcond=None)[0]
+            if (z >= 0).all():
+                best = min(best, np.linalg.norm(A @ z - b))
+    assert (x >= 0).all()
+    assert np.linalg.norm(A @ x - b) <= best + 1e-9
+
+
+# Voix plus lente que le modèle par défaut, aux pauses de phrase courtes
+VOICE = {"chars": 0.08, "words": 0.0, "short_pauses": 0.1, "sentence_pauses": 0.1,
+         "paragraph_pauses": 0.0, "intercept": 0.2}
+
+
+def voice_seconds(text: str) -> float:
+    features = dict(zip(FEATURES, text_features(text)))
+    return VOICE["intercept"] + sum(VOICE[name] * value for name, value in features.items())
+
+
+def test_fit_learns_the_voice_instead_of_scaling_the_default(tmp_path):
+    model = DurationModel(str(tmp_path / "durations.json"), min_samples=12)
+    rng = np.random.default_rng(2)
+    texts = [" ".join(rng.choice(SENTENCES, size=rng.integers(1, 6))) for _ in range(60)]
+    for text in texts[:40]:
+        model.observe("fr-FR-Test", text, voice_seconds(text) + rng.normal(0, 0.1), save=False)
+
+    coefficients = model.coefficients["fr-FR-Test"]
+    assert all(coefficients[name] >= 0 for name in FEATURES + ("intercept",))
+    scale = coefficients["chars"] / DEFAULT_COEFFICIENTS["chars"]
+    assert coefficients["sentence_pauses"] < DEFAULT_COEFFICIENTS["sentence_pauses"] * scale / 2
+    errors = [abs(model.estimate(text, "fr-FR-Test") - voice_seconds(text)) for text in texts[40:]]
+    assert max(errors) < 0.5
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Tests du client HTTP partagé : limites par hôte, attente sans timeout, retries, adapter requests"""
+
+import json
+import threading
+import time
+
+import httpx
+import pytest
+import requests
+
+from http_client import HTTPClient, HTTPXAdapter
+
+
+def make_client(handler, **kwargs) -> HTTPClient:
+    client = HTTPClient(http2=False, **kwargs)
+    client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_per_host_limit_waits_without_timeout():
+    release = threading.Event()
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def handler(request):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        release.wait(5)
+        with lock:
+            active["now"] -= 1
+        return httpx.Response(200, text="ok")
+
+    client = make_client(handler, per_host_limit=2)
+    results, errors = [], []
+
+    def call():
+        try:
+            request = client.client.build_request("GET", "http://feeds.test/rss", timeout=None)
+            results.append(client.send(request).status_code)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    assert active["now"] == 2  # Les 3 autres attendent un emplacement, sans PoolTimeout
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == []
+    assert results == [200] * 5
+    assert active["max"] == 2
+
+
+def test_pool_timeout_when_host_is_saturated():
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(5)
+        return httpx.Response(200)
+
+    client = make_client(handler, per_host_limit=1)
+    busy = threading.Thread(target=lambda: client.send(client.client.build_request("GET", "http://a.test/")))
+    busy.start()
+    time.sleep(0.1)
+    request = client.client.build_request("GET", "http://a.test/", timeout=httpx.Timeout(5, pool=0.1))
+    with pytest.raises(httpx.PoolTimeout):
+        client.send(request)
+    release.set()
+    busy.join(5)
+
+
+def test_retries_idempotent_requests_on_503():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) < 3:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, text="ok")
+
+    client = make_client(handler, retries=2)
+    response = client.send(client.client.build_request("GET", "http://a.test/"))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert client.stats()["a.test"]["retries"] == 2
+
+
+def test_post_is_not_retried_by_default():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    client = make_client(handler, retries=2)
+    response = client.send(client.client.build_request("POST", "http://a.test/", content=b"{}"))
+    assert response.status_code == 503
+    assert calls == ["POST"]
+
+
+def test_connect_errors_are_retried_then_raised():
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler, retries=2, backoff=0.001)
+    with pytest.raises(httpx.ConnectError):
+        client.send(client.client.build_request("GET", "http://down.test/"))
+    assert len(calls) == 3
+    assert client.stats()["down.test"]["errors"] == 3
+
+
+def test_adapter_streams_ndjson_lines_as_they_arrive():
+    first_line_read = threading.Event()
+    seen_by_server = []
+
+    def body():
+        yield b'{"response": "a"}\n'
+        # Le second token n'est produit qu'une fois le premier lu par le client
+        seen_by_server.append(first_line_read.wait(2))
+        yield b'{"done": true}\n'
+
+    client = make_client(lambda request: httpx.Response(200, content=body()))
+    session = requests.Session()
+    session.trust_env = False  # Pas de proxy ni de bundle CA de l'environnement
+    session.mount("http://", HTTPXAdapter(client))
+    lines = []
+    with session.post("http://ollama.test/api/generate", json={}, stream=True) as response:
+        for line in response.iter_lines():
+            lines.append(json.loads(line))
+            first_line_read.set()
+
+    assert lines == [{"response": "a"}, {"done": True}]
+    assert seen_by_server == [True]
+
+
+def test_adapter_routes_proxied_requests_through_their_own_client():
+    client = make_client(lambda request: httpx.Response(200))
+    assert client.variant() is client.client
+    proxied = client.variant(proxy="http://proxy.test:3128")
+    assert proxied is not client.client
+    assert client.variant(proxy="http://proxy.test:3128") is proxied
+    assert client.variant(verify=False) is not proxied
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests des schémas de sortie : validation/normalisation et compteurs par modèle"""
+
+import json
+
+from llm_schemas import EXTRACTION_SCHEMA, SchemaCounters, parse_json_object, validate
+from ollama_extractor import OllamaNewsExtractor
+
+VALID = {
+    "summary": "Prusa annonce la Core One.",
+    "technical_points": ["CoreXY", "chambre fermée"],
+    "market_impact": "Concurrence directe de Bambu Lab",
+    "relevance_score": 8,
+    "keywords": ["prusa", "corexy"]
+}
+
+
+def test_valid_output_has_no_errors():
+    cleaned, errors = validate(dict(VALID), EXTRACTION_SCHEMA)
+    assert errors == []
+    assert cleaned == VALID
+
+
+def test_unambiguous_drift_is_normalized():
+    value = dict(VALID, relevance_score="7.6", keywords="prusa, corexy , ", market_impact=12)
+    cleaned, errors = validate(value, EXTRACTION_SCHEMA)
+    assert errors == []
+    assert cleaned["relevance_score"] == 8
+    assert cleaned["keywords"] == ["prusa", "corexy"]
+    assert cleaned["market_impact"] == "12"
+
+
+def test_scores_are_clamped_to_bounds():
+    cleaned, errors = validate(dict(VALID, relevance_score=42), EXTRACTION_SCHEMA)
+    assert errors == []
+    assert cleaned["relevance_score"] == 10
+
+
+def test_missing_and_wrong_types_are_reported():
+    value = dict(VALID, technical_points={"a": 1}, relevance_score="élevé")
+    del value["summary"]
+    _, errors = validate(value, EXTRACTION_SCHEMA)
+    assert "summary: champ manquant" in errors
+    assert "technical_points: liste attendue" in errors
+    assert "relevance_score: nombre attendu" in errors
+
+
+def test_nested_item_errors_carry_their_path():
+    _, errors = validate(dict(VALID, keywords=["ok", {"x": 1}]), EXTRACTION_SCHEMA)
+    assert errors == ["keywords[1]: texte attendu"]
+
+
+def test_parse_json_object():
+    assert parse_json_object('Réponse : {"a": 1} fin') == {"a": 1}
+    assert parse_json_object("[1, 2]") is None
+    assert parse_json_object('{"a": ') is None
+
+
+def test_counters_rates():
+    counters = SchemaCounters()
+    for outcome in ("valid", "valid", "repaired", "failed"):
+        counters.record("m", outcome)
+    summary = counters.summary()["m"]
+    assert summary["total"] == 4
+    assert summary["success_rate"] == 0.75
+    assert summary["first_try_rate"] == 0.5
+
+
+class FakeClient:
+    def __init__(self, cached):
+        self.cached = cached
+
+    def generate_stream(self, model, prompt, **kwargs):
+        stats = {"ttft": 0.1, "eval_tokens": 10, "tokens_per_s": 20.0, "stopped": "json_complete",
+                 "prompt_tokens": 120}
+        if self.cached:
+            stats["cached"] = True
+        return {"response": json.dumps(VALID), "stats": stats}
+
+
+def test_cached_responses_are_not_counted(monkeypatch):
+    counters = SchemaCounters()
+    monkeypatch.setattr("ollama_extractor.SCHEMA_COUNTERS", counters)
+    article = {"title": "Prusa Core One", "content": "Prusa annonce la Core One.", "source": "test"}
+    OllamaNewsExtractor(client=FakeClient(cached=False), model="m").extract(article)
+    OllamaNewsExtractor(client=FakeClient(cached=True), model="m").extract(article)
+    assert counters.summary()["m"]["total"] == 1
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Tests du client Ollama : détection de fin d'objet JSON et cache des générations streamées"""
+
+import json
+
+import pytest
+
+from llm_cache import LLMResponseCache
+from ollama_client import JSONObjectScanner, OllamaClient
+
+
+def scan(*chunks):
+    scanner = JSONObjectScanner()
+    for chunk in chunks:
+        result = scanner.feed(chunk)
+        if result is not None:
+            return result
+    return None
+
+
+def test_scanner_skips_chatter_and_stops_at_closing_brace():
+    assert scan('Voici le JSON : {"a": 1', ', "b": [1, {"c": 2}]}', " et du texte après") == \
+        '{"a": 1, "b": [1, {"c": 2}]}'
+
+
+def test_scanner_ignores_braces_inside_strings():
+    text = '{"title": "a } b { c", "quote": "il a dit \\"}\\"", "n": 2}'
+    assert scan(*text) == text
+    assert json.loads(scan(text))["n"] == 2
+
+
+def test_scanner_waits_for_unclosed_object():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('{"summary": "coupé') is None
+    assert scanner.complete is None
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for line in self.lines:
+            yield json.dumps(line).encode()
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, lines):
+        self.lines = lines
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.lines)
+
+
+def make_client(tmp_path, lines):
+    client = OllamaClient("http://ollama.test", cache=LLMResponseCache(str(tmp_path / "cache.db")))
+    client.session = FakeSession(lines)
+    client.pool.close()
+    return client
+
+
+def tokens(text):
+    return [{"response": char} for char in text]
+
+
+def test_complete_json_is_cached(tmp_path):
+    client = make_client(tmp_path, tokens('{"a": 1} fin') + [{"done": True}])
+    first = client.generate_stream("m", "p")
+    assert first["stats"]["stopped"] == "json_complete"
+    second = client.generate_stream("m", "p")
+    assert second["stats"].get("cached")
+    assert client.session.calls == 1
+
+
+def test_token_budget_cut_is_not_cached(tmp_path):
+    client = make_client(tmp_path, tokens('{"summary": "très long"}'))
+    first = client.generate_stream("m", "p", token_budget=5)
+    assert first["stats"]["stopped"] == "token_budget"
+    client.generate_stream("m", "p", token_budget=5)
+    assert client.session.calls == 2
+
+
+def test_stream_ending_before_json_closes_is_not_cached(tmp_path):
+    client = make_client(tmp_path, tokens('{"summary": "cou') + [{"done": True, "done_reason": "length"}])
+    first = client.generate_stream("m", "p")
+    assert first["stats"]["stopped"] == "truncated"
+    client.generate_stream("m", "p")
+    assert client.session.calls == 2
+
+
+class GarbledResponse(FakeResponse):
+    def iter_lines(self):
+        yield b"<html>proxy</html>"
+
+
+def test_host_is_released_when_the_stream_is_not_json(tmp_path):
+    client = make_client(tmp_path, [])
+    client.session.post = lambda url, **kwargs: GarbledResponse([])
+    with pytest.raises(ValueError):
+        client.generate_stream("m", "p")
+    state = client.pool.state[client.pool.hosts[0]]
+    assert state["outstanding"] == 0
+    assert state["failures"] == 0
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests du clustering SimHash des quasi-doublons"""
+
+from story_clusterer import StoryClusterer
+
+PRUSA = {
+    "title": "Prusa unveils the Core One enclosed CoreXY 3D printer",
+    "content": "Prusa Research announced the Core One, an enclosed CoreXY printer with a steel frame, "
+               "active chamber heating and compatibility with the MK4 toolhead.",
+    "link": "https://a.test/prusa-core-one",
+    "source": "A"
+}
+PRUSA_REPOST = {
+    "title": "Prusa unveils the Core One enclosed CoreXY 3D printer",
+    "content": "Prusa Research announced the Core One, an enclosed CoreXY printer with a steel frame, "
+               "active chamber heating and compatibility with the MK4 toolhead. <b>Read more</b>",
+    "link": "https://b.test/news/core-one",
+    "source": "B"
+}
+METAL = {
+    "title": "Nikon SLM Solutions ships a twelve laser metal powder bed system",
+    "content": "The NXG 600E targets aerospace production with a build volume of 600 mm and "
+               "twelve 1 kW lasers for titanium and aluminium parts.",
+    "link": "https://c.test/nxg-600e",
+    "source": "C"
+}
+
+
+def test_reposts_join_one_story():
+    clusterer = StoryClusterer()
+    stories = clusterer.cluster([dict(PRUSA), dict(PRUSA_REPOST), dict(METAL)])
+    assert len(stories) == 2
+    merged = next(story for story in stories if story["cluster_size"] == 2)
+    assert sorted(merged["sources"]) == ["A", "B"]
+    assert len(merged["links"]) == 2
+    assert len(merged["duplicates"]) == 1
+
+
+def test_distinct_stories_stay_apart():
+    clusterer = StoryClusterer()
+    assert clusterer.add(dict(PRUSA)) != clusterer.add(dict(METAL))
+    assert clusterer.cluster_count() == 2
+
+
+def test_empty_articles_do_not_collide():
+    clusterer = StoryClusterer()
+    empties = [{"title": "", "content": ""}, {"title": "", "content": "<p></p>"},
+               {"title": "the and of", "content": "de la"}]
+    for article in empties:
+        clusterer.add(article)
+    assert clusterer.cluster_count() == 3
+    assert clusterer.simhash(empties[0]) is None
+
+
+def test_empty_article_does_not_join_a_real_story():
+    clusterer = StoryClusterer()
+    first = clusterer.add(dict(PRUSA))
+    assert clusterer.add({"title": "", "content": ""}) != first
+    assert clusterer.cluster_count() == 2
+
+
+def test_incremental_roots_follow_merges():
+    clusterer = StoryClusterer()
+    a = clusterer.add(dict(PRUSA))
+    b = clusterer.add(dict(METAL))
+    c = clusterer.add(dict(PRUSA_REPOST))
+    assert clusterer.root(c) == clusterer.root(a)
+    assert clusterer.is_root(a) and clusterer.is_root(b)
+    assert clusterer.cluster_story(c)["cluster_size"] == 2
+
+
+def test_simhash_distance_of_reposts_is_small():
+    clusterer = StoryClusterer()
+    distance = bin(clusterer.simhash(PRUSA) ^ clusterer.simhash(PRUSA_REPOST)).count("1")
+    assert distance <= clusterer.max_distance
+    assert bin(clusterer.simhash(PRUSA) ^ clusterer.simhash(METAL)).count("1") > clusterer.max_distance
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Tests du moteur de tendances : un article n'est compté qu'une fois sur la fenêtre"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+
+from trend_engine import TrendEngine
+
+TODAY = date(2026, 3, 10)
+ARTICLE = {"title": "Bambu Lab H2D announced", "link": "https://a.test/h2d?utm_source=rss"}
+
+
+def test_article_still_in_feed_is_counted_once_across_days(tmp_path):
+    engine = TrendEngine(store_dir=str(tmp_path))
+    assert engine.update([dict(ARTICLE)], TODAY - timedelta(days=1)) == 1
+    assert engine.update([dict(ARTICLE, link="https://a.test/h2d")], TODAY) == 0
+    assert not (tmp_path / f"{TODAY.isoformat()}.parquet").exists()
+
+
+def test_counted_keys_expire_after_the_window(tmp_path):
+    engine = TrendEngine(store_dir=str(tmp_path), recent_days=2, baseline_days=5)
+    engine.update([dict(ARTICLE)], TODAY)
+    assert engine.update([dict(ARTICLE)], TODAY + timedelta(days=6)) == 0
+    assert engine.update([dict(ARTICLE)], TODAY + timedelta(days=7)) == 1
+    counts = pd.read_parquet(tmp_path / f"{(TODAY + timedelta(days=7)).isoformat()}.parquet")
+    assert "bambu lab h2d" in set(counts["term"])
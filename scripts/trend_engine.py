@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+JT 3D PRINTING NEWS - Trend Engine
+Comptes quotidiens des termes et entités (un fichier Parquet par jour), mis à
+jour à chaque run, et score de burst de chaque terme contre sa moyenne mobile.
+Seuls les fichiers de la fenêtre de base sont relus : un an d'historique ne
+ralentit pas un run.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List
+
+import pandas as pd
+
+from seen_store import SeenArticleStore
+from story_clusterer import STOPWORDS, TAG_RE, WORD_RE
+
+logger = logging.getLogger(__name__)
+
+# Suite de mots capitalisés dans un titre : "Bambu Lab", "Core One", "Formlabs"
+ENTITY_RE = re.compile(r"\b[A-Z][\w-]*(?:\s+[A-Z0-9][\w-]*)*")
+# Termes présents dans presque toutes les news du domaine : jamais "en tendance"
+DOMAIN_STOPWORDS = {"3d", "print", "printing", "printer", "printers", "printed", "impression", "imprimante"}
+
+
+class TrendEngine:
+    """Comptes quotidiens (Parquet) et bursts des termes"""
+
+    def __init__(
+        self,
+        store_dir: str = "data/trends",
+        baseline_days: int = 28,
+        recent_days: int = 2,
+        min_count: int = 3,
+        min_burst: float = 2.0,
+        weight: float = 5.0,
+        cap: int = 20,
+        min_history_days: int = 7
+    ):
+        """
+        Initialise le moteur
+
+        Args:
+            store_dir: Dossier des fichiers Parquet quotidiens
+            baseline_days: Jours de la moyenne mobile de référence
+            recent_days: Jours récents (aujourd'hui inclus) comparés à la référence
+            min_count: Occurrences récentes min pour qu'un terme soit en tendance
+            min_burst: Burst min pour donner un bonus
+            weight: Points de score par unité de burst
+            cap: Bonus de tendance max par article
+            min_history_days: Jours de référence enregistrés requis avant tout bonus
+        """
+        self.store_dir = store_dir
+        self.baseline_days = baseline_days
+        self.recent_days = recent_days
+        self.min_count = min_count
+        self.min_burst = min_burst
+        self.weight = weight
+        self.cap = cap
+        self.min_history_days = min_history_days
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.bursts = {}
+
+    def refresh(self, today: date = None) -> Dict[str, float]:
+        """Recalcule les bursts à partir des fichiers de la fenêtre (récente + référence)"""
+        today = today or date.today()
+        days = [today - timedelta(days=i) for i in range(self.recent_days + self.baseline_days)]
+        frames = []
+        for day in days:
+            path = self._day_path(day)
+            if os.path.exists(path):
+                frame = pd.read_parquet(path)
+                frame["day"] = (today - day).days
+                frames.append(frame)
+        history = sum(1 for day in days[self.recent_days:] if os.path.exists(self._day_path(day)))
+        if history < self.min_history_days:
+            # Démarrage à froid : sans référence, tous les termes auraient l'air en tendance
+            logger.info(f"📈 Tendances: {history}/{self.min_history_days} jours d'historique, pas encore de bonus")
+            self.bursts = {}
+            return self.bursts
+
+        counts = pd.concat(frames, ignore_index=True)
+        # Matrice terme x ancienneté (jours sans occurrence = 0)
+        matrix = counts.pivot_table(index="term", columns="day", values="count", aggfunc="sum", fill_value=0)
+        matrix = matrix.reindex(columns=range(len(days)), fill_value=0)
+
+        recent = matrix.iloc[:, :self.recent_days].sum(axis=1)
+        baseline = matrix.iloc[:, self.recent_days:]
+        # Attendu sur la fenêtre récente, écart de type Poisson (variance ~ moyenne)
+        expected = baseline.mean(axis=1) * self.recent_days
+        spread = (baseline.std(axis=1, ddof=0) * math.sqrt(self.recent_days)).clip(lower=(expected + 1) ** 0.5)
+        burst = (recent - expected) / spread
+
+        trending = burst[(recent >= self.min_count) & (burst >= self.min_burst)]
+        self.bursts = trending.sort_values(ascending=False).round(2).to_dict()
+        if self.bursts:
+            top = ", ".join(f"{term} ({value:.1f})" for term, value in list(self.bursts.items())[:5])
+            logger.info(f"📈 Tendances: {top}")
+        return self.bursts
+
+    def update(self, articles: List[Dict], today: date = None) -> int:
+        """Ajoute au fichier du jour les termes des articles jamais comptés sur la fenêtre"""
+        today = today or date.today()
+        counted = self._load_counted(today)
+        new_counts = Counter()
+        added = 0
+        for article in articles:
+            key = SeenArticleStore.normalize_link(article.get("link", "")) or article.get("title", "")
+            if not key or key in counted:
+                continue
+            counted[key] = today.isoformat()
+            new_counts.update(self.terms(article))
+            added += 1
+        if not added:
+            return 0
+
+        path = self._day_path(today)
+        frame = pd.DataFrame({"term": list(new_counts), "count": list(new_counts.values())})
+        if os.path.exists(path):
+            frame = pd.concat([pd.read_parquet(path), frame]).groupby("term", as_index=False)["count"].sum()
+        frame["count"] = frame["count"].astype("int32")
+        frame.to_parquet(path, index=False)
+        self._save_counted(counted)
+        logger.info(f"📈 Trend store: {added} articles comptés ({len(frame)} termes le {today.isoformat()})")
+        return added
+
+    def boost(self, article: Dict) -> int:
+        """Bonus de score d'un article selon le terme le plus en tendance qu'il contient"""
+        if not self.bursts:
+            return 0
+        best = max((self.bursts.get(term, 0.0) for term in self.terms(article)), default=0.0)
+        return min(self.cap, int(round(self.weight * best)))
+
+    @staticmethod
+    def terms(article: Dict) -> List[str]:
+        """Termes (mots du titre et du résumé) et entités (noms capitalisés du titre), dédupliqués"""
+        title = article.get("title", "")
+        text = f"{title} {TAG_RE.sub(' ', article.get('content', ''))}".lower()
+        terms = {word for word in WORD_RE.findall(text)
+                 if len(word) > 2 and not word.isdigit() and word not in STOPWORDS and word not in DOMAIN_STOPWORDS}
+        for entity in ENTITY_RE.findall(title):
+            if " " in entity:
+                terms.add(entity.lower())
+        return list(terms)
+
+    def _day_path(self, day: date) -> str:
+        return os.path.join(self.store_dir, f"{day.isoformat()}.parquet")
+
+    def _counted_path(self) -> str:
+        return os.path.join(self.store_dir, "counted.json")
+
+    def _load_counted(self, today: date) -> Dict[str, str]:
+        """
+        Articles déjà comptés -> jour du comptage, sur toute la fenêtre récente + référence : un article
+        resté dans un flux (ou servi par un cache) plusieurs jours ne compte qu'une fois
+        """
+        oldest = (today - timedelta(days=self.recent_days + self.baseline_days)).isoformat()
+        try:
+            with open(self._counted_path(), "r") as f:
+                counted = json.load(f)
+        except (OSError, ValueError):
+            counted = {}
+        return {key: day for key, day in counted.items() if day > oldest}
+
+    def _save_counted(self, counted: Dict[str, str]):
+        tmp_path = f"{self._counted_path()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(counted, f)
+        os.replace(tmp_path, self._counted_path())
+
+
+def main():
+    """Fonction de test"""
+    import random
+    import tempfile
+    import time
+
+    logging.basicConfig(level=logging.WARNING)
+    engine = TrendEngine(store_dir=tempfile.mkdtemp(prefix="jt3d-trends-"))
+    rng = random.Random(0)
+    words = ["resin", "filament", "nozzle", "firmware", "slicer", "enclosure", "toolchanger", "metal"]
+    today = date.today()
+
+    # Un an d'historique, puis un jour où "Bambu Lab H2D" explose
+    for age in range(365, 0, -1):
+        articles = [{"title": f"{rng.choice(words).title()} news {i}", "link": f"http://x/{age}/{i}"} for i in range(30)]
+        engine.update(articles, today - timedelta(days=age))
+    engine.update([{"title": "Bambu Lab H2D toolchanger announced", "link": f"http://x/h2d/{i}"} for i in range(8)], today)
+
+    start = time.perf_counter()
+    bursts = engine.refresh(today)
+    print(f"\n📈 refresh sur un an d'historique: {(time.perf_counter() - start) * 1000:.0f} ms")
+    for term, value in list(bursts.items())[:5]:
+        print(f"   {term:25} burst {value:5.1f}")
+    print(f"\n   bonus 'Bambu Lab H2D': {engine.boost({'title': 'Bambu Lab H2D review'})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ import os
 import logging
 from typing import Optional
 
+from duration_model import audio_duration, spoken_text
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -32,14 +34,16 @@ class TTSGenerator:
         "antoine": "fr-CA-AntoineNeural",    # Voix masculine canadienne
     }
     
-    def __init__(self, voice: str = "denise"):
+    def __init__(self, voice: str = "denise", duration_model=None):
         """
         Initialise le générateur TTS
         
         Args:
             voice: Nom de la voix (denise, henri, alain, brigitte, sylvie, antoine)
+            duration_model: DurationModel recalibré avec la durée de chaque audio généré (optionnel)
         """
         self.voice_name = voice.lower()
+        self.duration_model = duration_model
         self.voice = self.FRENCH_VOICES.get(
             self.voice_name, 
             "fr-FR-DeniseNeural"  # Défaut
@@ -81,6 +85,14 @@ class TTSGenerator:
         file_size = os.path.getsize(output_file) / 1024  # KB
         logger.info(f"✅ Audio généré: {file_size:.1f} KB")
         
+        # Durée réelle -> calibrage de l'estimation pour cette voix
+        if self.duration_model:
+            seconds = audio_duration(output_file)
+            if seconds:
+                estimated = self.duration_model.estimate(text, self.voice_name)
+                logger.info(f"   Durée: {seconds:.1f}s (estimée {estimated:.1f}s)")
+                self.duration_model.observe(self.voice_name, text, seconds)
+        
         return output_file
     
     def generate_audio(
@@ -124,6 +136,9 @@ class TTSGenerator:
                 speaker = dialogue.get("speaker", "")
                 content = dialogue.get("content", "")
                 text += content + "\n\n"
+        elif "segments" in script:
+            # Format du générateur de script (ouverture, segments, clôture)
+            text = spoken_text(script)
         elif "content" in script:
             # Format simple
             text = script["content"]